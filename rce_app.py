@@ -0,0 +1,45 @@
+import streamlit as st
+
+from rce_engine import RESULTS
+
+# --- Multi-page app ---
+# Every historical version is a page of one process: the pages share the
+# engine, the layout cache and the result cache, so a run made on one page
+# is served from memory on any other asking for the same parameters.
+# Run with: streamlit run rce_app.py
+PAGES = {
+    "Current": [
+        ("rce_fentes_pro.py", "Pro simulator", "pro", "🧪"),
+    ],
+    "Versions": [
+        ("rce_fentes.py", "v1 – Simulation des fentes", "v1", "🔗"),
+        ("rce_fentes_v2.py", "v2 – Fentes", "v2", "🔗"),
+        ("rce_fentes_rce_vs_quantum.py", "RCE vs Quantum", "rce-vs-quantum", "⚖️"),
+        ("rce_fentes_app_v2.1.py", "v2.1", "v2-1", "📈"),
+        ("rce_fentes_app_v2.2.py", "v2.2", "v2-2", "📈"),
+        ("rce_fentes_app_v2.3.py", "v2.3", "v2-3", "📈"),
+        ("rce_fentes_app_v2.4.py", "v2.4", "v2-4", "📈"),
+        ("rce_fentes_app_v2.5.py", "v2.5", "v2-5", "📈"),
+        ("rce_fentes_app_v2.6.py", "v2.6", "v2-6", "📈"),
+        ("rce_fentes_app_v2.7.py", "v2.7", "v2-7", "📈"),
+    ],
+}
+
+
+def cache_panel():
+    stats = RESULTS.stats()
+    with st.sidebar.expander("🗄️ Shared result cache"):
+        st.caption(f"{stats['entries']} results, {stats['bytes'] / 2 ** 20:.1f} / "
+                   f"{stats['max_bytes'] / 2 ** 20:.0f} MiB")
+        st.caption(f"{stats['hits']} hits, {stats['misses']} misses")
+        if "store" in stats:
+            store = stats["store"]
+            st.caption(f"Disk store {store['root']}: {store['entries']} results, "
+                       f"{store['bytes'] / 2 ** 20:.1f} MiB")
+
+
+page = st.navigation({section: [st.Page(path, title=title, url_path=url, icon=icon, default=url == "pro")
+                                for path, title, url, icon in pages]
+                      for section, pages in PAGES.items()})
+page.run()
+cache_panel()
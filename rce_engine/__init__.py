@@ -0,0 +1,49 @@
+import importlib
+
+# Public name -> submodule. Submodules are imported on first access (PEP 562),
+# so an app only loads networkx, or anything else heavy, on the code paths
+# that use it: pages import the graph helpers inside the branch that draws
+# the graph, and the first rerun taking it pays for networkx.
+_EXPORTS = {
+    "animation": ("FRAMES", "arrivals", "frame_bounds"),
+    "cache": ("RESULTS", "ResultCache", "cached_simulate", "cached_stream", "memoize"),
+    "counters": ("CounterRNG",),
+    "csr": ("CoherenceGraph",),
+    "detector2d": ("DenseAccumulator", "SparseAccumulator", "accumulator", "detect_2d",
+        "screen_2d"),
+    "fraunhofer": ("aperture_mask", "far_field", "far_field_screen", "grating_mask"),
+    "incremental": ("LiveGraph",),
+    "graphs": ("build_graph", "edge_coordinates", "edge_segments", "generate_coherence_graph",
+        "grating_graph", "known_graphs", "layout", "node_coordinates", "rce_graph",
+        "relational_graph", "static_coherence_graph", "topology_key", "warm_layouts",
+        "weighted_coherence_graph"),
+    "parallel": ("simulate_sharded",),
+    "paths": ("actualization_path", "actualization_paths", "best_paths", "edge_arrays",
+        "path_edges"),
+    "perf": ("Recorder", "recording", "span"),
+    "propagation": ("actualization_probabilities", "context_mu"),
+    "sampling": ("MODELS", "SCREEN_ENGINES", "bin_centres", "hit_range", "histogram",
+        "sample_screen", "simulate_double_slit", "simulate_hits", "simulate_hits_rce"),
+    "screens": ("RELATIONAL_MODELS", "coherence_screen", "generate_interference",
+        "interference_screen", "noisy", "relational_screen"),
+    "simulators": ("CHUNK", "SCREENS", "SIMULATORS", "prepare", "simulate", "simulate_range", "stream"),
+    "store": ("DiskStore", "open_store"),
+    "sweeps": ("parameter_grid", "summarize", "sweep", "visibility", "write_sweep"),
+    "worker": ("Job", "Runner"),
+}
+
+_MODULES = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = sorted(_MODULES)
+
+
+def __getattr__(name):
+    if name not in _MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_MODULES[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
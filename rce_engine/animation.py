@@ -0,0 +1,65 @@
+import numpy as np
+
+from .counters import ARRIVALS, blocks, counter_rng
+from .perf import span
+from .simulators import CHUNK, _chunks, prepare
+
+# Frames of an animation by default, and at most: the frame table holds
+# frames × bins counts whatever the number of particles
+FRAMES = 100
+MAX_FRAMES = 1000
+
+
+def frame_bounds(n, frames=FRAMES):
+    # Particles arrived at the end of each frame, evenly spaced over the run
+    if not 1 <= frames <= MAX_FRAMES:
+        raise ValueError(f"frames must be between 1 and {MAX_FRAMES}, got {frames}")
+    return np.arange(1, frames + 1) * n // frames
+
+
+def _split(counts, lost, takes, rng):
+    # The particles of one chunk are exchangeable, so their arrival order is a
+    # uniform shuffle: consecutive slices of it are multivariate
+    # hypergeometric draws from what is left of the chunk. Particles the
+    # screen did not record (closed slit, out of range) are the last colour.
+    left = np.append(counts, lost).astype(np.int64)
+    for take in takes:
+        take = min(take, int(left.sum()))
+        drawn = rng.multivariate_hypergeometric(left, take)
+        left -= drawn
+        yield drawn[:-1]
+
+
+# --- Arrival frames ---
+# The run is streamed once, chunk by chunk as in simulate(), and each chunk's
+# histogram is split at the frame boundaries falling inside it. Returns the
+# per-frame deltas (frames × bins, the hits recorded during each frame), the
+# edges and the frame boundaries: np.cumsum(deltas, axis=0) is the screen
+# after every frame, and its last row equals simulate() with the same seed
+# and chunk. Memory is one chunk plus the frame table.
+def arrivals(name, n, frames=FRAMES, rng=None, chunk=CHUNK, **params):
+    bounds = frame_bounds(n, frames)
+    counters = counter_rng(rng)
+    if counters is None:
+        edges, draw = prepare(name, rng, **params)
+        steps = ((done - step, step, rng, rng) for done, step in _chunks(n, chunk))
+    else:
+        edges, draw = prepare(name, counters.setup(), **params)
+        steps = ((first, step, counters.block(k), counters.generator(ARRIVALS, k))
+                 for k, first, step in blocks(0, n, n, chunk))
+
+    deltas = np.zeros((frames, len(edges) - 1), dtype=np.int64)
+    for first, step, generator, order in steps:
+        counts = draw(step, generator)
+        with span("frames"):
+            # Frames of the chunk's first and last particles, and the
+            # particles of the chunk each one takes
+            lo, hi = np.searchsorted(bounds, [first, first + step - 1], side="right")
+            takes = np.diff(np.append(bounds[lo:hi], first + step), prepend=first)
+            lost = max(step - int(counts.sum()), 0)
+            for frame, drawn in zip(range(lo, hi + 1), _split(counts, lost, takes, order)):
+                deltas[frame] += drawn
+
+    # Smallest integer type holding every delta: the table is what gets sent
+    dtype = np.min_scalar_type(int(deltas.max(initial=0)))
+    return deltas.astype(dtype), edges, bounds
@@ -0,0 +1,318 @@
+import ast
+import datetime
+import json
+import os
+import pathlib
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from .animation import arrivals
+from .detector2d import detect_2d
+from .sampling import MODELS, simulate_double_slit, simulate_hits, simulate_hits_rce
+from .screens import generate_interference
+from .simulators import simulate
+from .sweeps import sweep
+
+PARTICLE_SCALES = tuple(10 ** k for k in range(2, 8))
+# Slits of a grating graph with GRAPH_DETECTORS positions (slits × 1000 edges)
+GRAPH_SCALES = (10, 100, 1000)
+GRAPH_DETECTORS = 1000
+# Nodes of a chain graph: as deep as a DAG gets
+CHAIN_SCALES = (1000, 10000, 100000)
+# Points of a rendered screen
+FIGURE_SCALES = tuple(10 ** k for k in range(2, 7))
+
+# Rises of traced memory smaller than this are not counted as allocations:
+# the probe's own bookkeeping stays under it
+ALLOC_GRAIN = 1 << 10
+
+HISTORY = "benchmarks/history.json"
+BASELINE = "benchmarks/baseline.json"
+
+# Cold imports timed by the import report, besides the apps' own import blocks
+IMPORT_TARGETS = ("numpy", "networkx", "plotly.graph_objects", "matplotlib.pyplot", "streamlit",
+                  "rce_engine", "rce_engine.figures")
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+
+
+# --- Cases ---
+# name -> (scales, setup); setup(scale, rng) does the untimed preparation and
+# returns the zero-argument callable that is measured.
+def _hits(model):
+    return lambda n, rng: lambda: simulate_hits(model, n, 0.1, True, True, rng)
+
+
+# Graph cases import .graphs / .paths themselves, so `python -m rce_engine
+# bench` on particle cases never pulls networkx in.
+def _rce_graphs(k, rng):
+    from .graphs import rce_graph
+    return lambda: [rce_graph(True, True) for _ in range(k)]
+
+
+def _grating_graph(slits, rng):
+    from .graphs import grating_graph
+    return lambda: grating_graph(slits, GRAPH_DETECTORS)
+
+
+def _grating_path(slits, rng):
+    from .graphs import grating_graph
+    from .paths import actualization_path
+    G = grating_graph(slits, GRAPH_DETECTORS)
+    return lambda: actualization_path(G, "Source", [f"Hit {j}" for j in range(GRAPH_DETECTORS)])
+
+
+def _grating_propagation(slits, rng):
+    from .graphs import grating_graph
+    from .propagation import actualization_probabilities
+    G = grating_graph(slits, GRAPH_DETECTORS)
+    return lambda: actualization_probabilities(G, "Source")
+
+
+def _chain(nodes, rng):
+    from .csr import CoherenceGraph
+    return CoherenceGraph.from_edges(range(nodes), np.arange(nodes - 1), np.arange(1, nodes),
+                                     np.full(nodes - 1, 0.99))
+
+
+def _chain_paths(nodes, rng):
+    from .paths import best_paths
+    G = _chain(nodes, rng)
+    return lambda: best_paths(G, 0)
+
+
+def _chain_propagation(nodes, rng):
+    from .propagation import actualization_probabilities
+    G = _chain(nodes, rng)
+    return lambda: actualization_probabilities(G, 0)
+
+
+def _sweep(configs, rng):
+    # configs / 2 noise levels, detector off and on
+    grid = {"noise": np.linspace(0, 0.5, max(configs // 2, 1)), "detector": [False, True]}
+    return lambda: sweep("interference", grid, 3000, seed=0)
+
+
+def _distribution_figure(points, rng):
+    from .figures import plot_distribution
+    edges = np.linspace(-1, 1, points + 1)
+    counts = rng.integers(0, 100, points)
+    return lambda: plot_distribution(counts, edges, "bench")
+
+
+def _line_payload(points, rng):
+    # Decimation, trace choice and the JSON Streamlit sends to the browser
+    import plotly.graph_objects as go
+    from .figures import line_trace
+    x = np.linspace(-1, 1, points)
+    y = rng.random(points)
+    return lambda: go.Figure(line_trace(x, y, mode="lines")).to_json()
+
+
+def _graph_figure(scale, rng):
+    from .figures import plot_coherence_graph
+    from .graphs import generate_coherence_graph
+    return lambda: [plot_coherence_graph(generate_coherence_graph(True, True)) for _ in range(scale)]
+
+
+BENCHMARKS = {
+    **{f"simulate_hits[{model}]": (PARTICLE_SCALES, _hits(model)) for model in MODELS},
+    "simulate_double_slit": (PARTICLE_SCALES, lambda n, rng: lambda: simulate_double_slit(n, 0.1, rng=rng)),
+    "simulate_hits_rce": (PARTICLE_SCALES, lambda n, rng: lambda: simulate_hits_rce(n, 0.1, True, True, rng)),
+    "generate_interference": (PARTICLE_SCALES,
+                              lambda n, rng: lambda: generate_interference(n, 0.1, True, True, rng=rng)),
+    "simulate[grating]": (PARTICLE_SCALES, lambda n, rng: lambda: simulate("grating", n, 0, slits=100)),
+    "sweep[interference]": ((10, 100, 1000, 10000), _sweep),
+    "arrivals[double_slit]": (PARTICLE_SCALES, lambda n, rng: lambda: arrivals("double_slit", n, 200, 0)),
+    "detect_2d": (PARTICLE_SCALES, lambda n, rng: lambda: detect_2d(n, (1024, 1024), rng=0)),
+    "rce_graph": ((1, 10, 100), _rce_graphs),
+    "grating_graph": (GRAPH_SCALES, _grating_graph),
+    "actualization_path[grating]": (GRAPH_SCALES, _grating_path),
+    "actualization_probabilities[grating]": (GRAPH_SCALES, _grating_propagation),
+    "best_paths[chain]": (CHAIN_SCALES, _chain_paths),
+    "actualization_probabilities[chain]": (CHAIN_SCALES, _chain_propagation),
+    "plot_distribution": (FIGURE_SCALES, _distribution_figure),
+    "line_trace[json]": (FIGURE_SCALES, _line_payload),
+    "plot_coherence_graph": ((1, 10, 100), _graph_figure),
+}
+
+
+# --- Measurement ---
+def _seconds(fn, repeats):
+    best = np.inf
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _memory(fn):
+    # Separate run under tracemalloc and a line tracer. At every line (and
+    # return) the case runs, the traced peak since the previous one is read
+    # and reset: the highest is the case's peak, and the rises are the bytes
+    # it allocated, temporaries freed on the way included. allocations sums
+    # the rises of the interpreter's block count the same way (Python
+    # objects, array headers among them).
+    top = grown = allocations = 0
+    base, blocks = 0, sys.getallocatedblocks()
+
+    def probe(frame, event, arg):
+        nonlocal top, grown, allocations, base, blocks
+        current, peak = tracemalloc.get_traced_memory()
+        top = max(top, peak)
+        if peak - base >= ALLOC_GRAIN:
+            grown += peak - base
+            base = current
+        elif current < base:
+            base = current
+        tracemalloc.reset_peak()
+        count = sys.getallocatedblocks()
+        allocations += max(count - blocks, 0)
+        blocks = count
+        return probe
+
+    tracemalloc.start()
+    sys.settrace(probe)
+    try:
+        result = fn()
+    finally:
+        sys.settrace(None)
+        probe(None, "return", None)
+        tracemalloc.stop()
+    del result
+    return {"peak_bytes": top, "alloc_bytes": grown, "allocations": allocations}
+
+
+def run(names=None, max_scale=None, repeats=3, memory=True, seed=0):
+    results = []
+    for name in names or BENCHMARKS:
+        if name not in BENCHMARKS:
+            raise ValueError(f"Unknown benchmark: {name!r}")
+        scales, setup = BENCHMARKS[name]
+        for scale in scales:
+            if max_scale is not None and scale > max_scale:
+                continue
+            fn = setup(scale, np.random.default_rng(seed))
+            entry = {"case": name, "scale": scale, "seconds": _seconds(fn, repeats)}
+            if memory:
+                entry.update(_memory(fn))
+            results.append(entry)
+    return results
+
+
+# --- Import times ---
+# Each statement runs in a fresh interpreter under -X importtime, from the
+# repo root like the apps. Every entry is (cumulative seconds, module count,
+# per-module self seconds); the cumulative total also lands in the results as
+# "import[<target>]", so the baseline check catches a slower cold start.
+def import_times(statements):
+    times = {}
+    for statement in statements:
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], cwd=ROOT,
+                              capture_output=True, text=True)
+        if proc.returncode:
+            raise ValueError(f"Import failed: {statement!r}\n{proc.stderr.strip().splitlines()[-1]}")
+        modules = {}
+        for line in proc.stderr.splitlines():
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            own, _, name = line[len("import time:"):].split("|")
+            if own.strip().isdigit():
+                modules[name.strip()] = int(own) / 1e6
+        times[statement] = modules
+    return times
+
+
+def app_imports(path):
+    # The app's top-level import block, i.e. what a cold start always pays
+    tree = ast.parse(pathlib.Path(path).read_text(encoding="utf-8"))
+    return "; ".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def run_imports(targets=IMPORT_TARGETS, apps=()):
+    statements = {f"import[{t}]": f"import {t}" for t in targets}
+    statements.update({f"import[{pathlib.Path(a).name}]": app_imports(a) for a in apps})
+    times = import_times(statements.values())
+    results = []
+    for case, statement in statements.items():
+        modules = times[statement]
+        results.append({"case": case, "scale": 1, "seconds": sum(modules.values()), "modules": len(modules),
+                        "slowest": sorted(modules.items(), key=lambda m: -m[1])[:5]})
+    return results
+
+
+def format_imports(results):
+    lines = [f"{'import':<40} {'ms':>9} {'modules':>8}  slowest"]
+    for r in results:
+        slowest = ", ".join(f"{name} {seconds * 1e3:.0f}" for name, seconds in r["slowest"][:3])
+        lines.append(f"{r['case']:<40} {r['seconds'] * 1e3:9.1f} {r['modules']:8d}  {slowest}")
+    return "\n".join(lines)
+
+
+# --- History and baseline ---
+def environment():
+    return {"timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(), "numpy": np.__version__,
+            "machine": platform.platform(), "cpus": os.cpu_count()}
+
+
+def _load(path, default):
+    path = pathlib.Path(path)
+    return json.loads(path.read_text()) if path.exists() else default
+
+
+def _dump(path, value):
+    path = pathlib.Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(value, indent=1))
+    return path
+
+
+def record(results, path=HISTORY):
+    history = _load(path, [])
+    history.append({**environment(), "results": results})
+    return _dump(path, history)
+
+
+def save_baseline(results, path=BASELINE):
+    return _dump(path, {**environment(), "results": results})
+
+
+def load_baseline(path=BASELINE):
+    return _load(path, None)
+
+
+# A case regresses when a metric grows by more than tolerance over the
+# baseline; timings below min_seconds are too noisy to compare.
+def compare(results, baseline, tolerance=0.25, min_seconds=1e-3):
+    reference = {(r["case"], r["scale"]): r for r in baseline["results"]}
+    regressions = []
+    for current in results:
+        base = reference.get((current["case"], current["scale"]))
+        if base is None:
+            continue
+        for metric in ("seconds", "peak_bytes", "alloc_bytes"):
+            if metric not in current or metric not in base or not base[metric]:
+                continue
+            if metric == "seconds" and max(current[metric], base[metric]) < min_seconds:
+                continue
+            ratio = current[metric] / base[metric]
+            if ratio > 1 + tolerance:
+                regressions.append({"case": current["case"], "scale": current["scale"], "metric": metric,
+                                    "baseline": base[metric], "current": current[metric], "ratio": ratio})
+    return regressions
+
+
+def format_results(results):
+    lines = [f"{'case':<30} {'scale':>9} {'seconds':>11} {'peak MiB':>9} {'alloc MiB':>10} {'allocations':>11}"]
+    for r in results:
+        peak = f"{r['peak_bytes'] / 2 ** 20:9.2f}" if "peak_bytes" in r else f"{'-':>9}"
+        grown = f"{r['alloc_bytes'] / 2 ** 20:10.2f}" if "alloc_bytes" in r else f"{'-':>10}"
+        allocations = f"{r['allocations']:11d}" if "allocations" in r else f"{'-':>11}"
+        lines.append(f"{r['case']:<30} {r['scale']:>9} {r['seconds']:11.6f} {peak} {grown} {allocations}")
+    return "\n".join(lines)
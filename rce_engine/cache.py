@@ -0,0 +1,162 @@
+import collections
+import functools
+import os
+import threading
+
+import numpy as np
+
+from .simulators import CHUNK, defaults, simulate, stream
+from .store import open_store
+
+# Default memory budget of the shared cache, overridable from the environment
+DEFAULT_MAX_BYTES = int(os.environ.get("RCE_CACHE_BYTES", 256 << 20))
+
+
+def _freeze(value):
+    # Cached arrays are shared between sessions: make them read-only
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    elif isinstance(value, (tuple, list)):
+        for v in value:
+            _freeze(v)
+    return value
+
+
+def _nbytes(value):
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sum(_nbytes(v) for v in value)
+    return 0
+
+
+# --- LRU result cache ---
+# One instance is shared by every Streamlit session of the process, hence the
+# lock. Entries are evicted least-recently-used first once the arrays they
+# hold exceed max_bytes. With a disk store behind it, a miss is looked up
+# there (results of other processes, or of earlier runs) before it counts as
+# one, and every new result is written through.
+class ResultCache:
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, store=None):
+        self.max_bytes = max_bytes
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+        try:
+            value = self.store.get(key) if self.store is not None else None
+        except KeyError:
+            value = None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                raise KeyError(key)
+            self.hits += 1
+        return self._remember(key, value)
+
+    def put(self, key, value):
+        if self.store is not None:
+            self.store.put(key, value)
+        return self._remember(key, value)
+
+    def _remember(self, key, value):
+        size = _nbytes(value)
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                return value
+            self._entries[key] = (_freeze(value), size)
+            self._bytes += size
+            self._evict()
+        return value
+
+    def resize(self, max_bytes):
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            stats = {"hits": self.hits, "misses": self.misses, "entries": len(self._entries),
+                     "bytes": self._bytes, "max_bytes": self.max_bytes}
+        if self.store is not None:
+            stats["store"] = self.store.stats()
+        return stats
+
+    def _evict(self):
+        while self._bytes > self.max_bytes:
+            self._bytes -= self._entries.popitem(last=False)[1][1]
+
+
+# Backed by the disk store at $RCE_STORE when that is set
+RESULTS = ResultCache(store=open_store())
+
+
+def _key(fn, args, kwargs, seed):
+    # Every Streamlit page runs as __main__: the defining file tells apart
+    # same-named functions of different pages
+    code = getattr(fn, "__code__", None)
+    return (fn.__module__, getattr(code, "co_filename", None), fn.__qualname__, args,
+            tuple(sorted(kwargs.items())), seed)
+
+
+# --- Memoized entry points ---
+# Wraps a function taking rng= into one taking seed=, keyed on the full
+# parameter tuple plus that seed. Parameters must be hashable.
+def memoize(fn, cache=RESULTS):
+    @functools.wraps(fn)
+    def wrapper(*args, seed=None, **kwargs):
+        key = _key(fn, args, kwargs, seed)
+        try:
+            return cache.get(key)
+        except KeyError:
+            pass
+        return cache.put(key, fn(*args, rng=np.random.default_rng(seed), **kwargs))
+    return wrapper
+
+
+def _run_key(name, n, chunk, params, seed):
+    # Defaults are spelled out, so omitting a parameter or passing its
+    # default value share one entry
+    return _key(simulate, (name, n, chunk), {**defaults(name), **params}, seed)
+
+
+def cached_simulate(name, n, seed=None, chunk=CHUNK, **params):
+    key = _run_key(name, n, chunk, params, seed)
+    try:
+        return RESULTS.get(key)
+    except KeyError:
+        pass
+    return RESULTS.put(key, simulate(name, n, seed, chunk, **params))
+
+
+# A streamed run ends on the same histogram as simulate(), so both share one
+# entry: a cached run is yielded at once, a new one is stored when it ends.
+def cached_stream(name, n, chunk=CHUNK, seed=None, **params):
+    key = _run_key(name, n, chunk, params, seed)
+    try:
+        cached = RESULTS.get(key)
+    except KeyError:
+        cached = None
+    if cached is not None:
+        yield (n, *cached)
+        return
+    for done, counts, edges in stream(name, n, chunk, seed, **params):
+        yield done, counts, edges
+    RESULTS.put(key, (counts, edges))
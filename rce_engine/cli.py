@@ -0,0 +1,234 @@
+import argparse
+import inspect
+import json
+import pathlib
+import sys
+
+import numpy as np
+
+from . import bench
+from .cache import RESULTS, cached_simulate
+from .counters import CounterRNG
+from .detector2d import detect_2d
+from .parallel import simulate_sharded
+from .simulators import CHUNK, SIMULATORS, defaults, simulate, simulate_range
+from .store import open_store
+from .sweeps import sweep, write_sweep
+
+
+# --- Result files ---
+def write_result(path, counts, edges, meta):
+    path = pathlib.Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix == ".json":
+        path.write_text(json.dumps({"meta": meta, "edges": edges.tolist(), "counts": counts.tolist()}))
+    elif path.suffix == ".csv":
+        table = np.column_stack([edges[:-1], edges[1:], counts])
+        np.savetxt(path, table, fmt="%.10g", delimiter=",", header="bin_left,bin_right,count", comments="")
+    else:
+        np.savez(path, counts=counts, edges=edges, meta=json.dumps(meta))
+    return path
+
+
+# --- Sweep grids ---
+# --grid noise=0:0.5:11 (start:stop:count) or --grid model=classical,rce;
+# values take the type of the simulator's default for that parameter.
+BOOLEANS = {"true": True, "1": True, "yes": True, "false": False, "0": False, "no": False}
+
+
+def _value(text, default):
+    if isinstance(default, bool):
+        if text.lower() not in BOOLEANS:
+            raise ValueError(f"Not a boolean: {text!r}")
+        return BOOLEANS[text.lower()]
+    return type(default)(text) if default is not None else float(text)
+
+
+def parse_grid(name, specs):
+    params = {**defaults(name), "n": 0}
+    grid = {}
+    for spec in specs:
+        key, sep, values = spec.partition("=")
+        if not sep or key not in params:
+            raise ValueError(f"Bad grid axis {spec!r}: expected PARAM=VALUES with PARAM one of "
+                             f"{', '.join(params)}")
+        if values.count(":") == 2:
+            start, stop, count = values.split(":")
+            grid[key] = np.linspace(float(start), float(stop), int(count)).astype(type(params[key]))
+        else:
+            grid[key] = [_value(v, params[key]) for v in values.split(",")]
+    return grid
+
+
+# --- Argument parsing ---
+# Simulator keyword arguments become options: --noise 0.2, --no-left-open, ...
+def _add_simulator_options(parser, fn, skip=()):
+    for name, param in inspect.signature(fn).parameters.items():
+        default = param.default
+        if name in ("n", "rng", *skip) or default is None:
+            continue
+        flag = "--" + name.replace("_", "-")
+        if isinstance(default, bool):
+            parser.add_argument(flag, dest=name, action=argparse.BooleanOptionalAction, default=default)
+        else:
+            parser.add_argument(flag, dest=name, type=type(default), default=default)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m rce_engine",
+                                     description="Headless double-slit simulations of the RCE apps.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    simulate_parser = commands.add_parser("simulate", help="run one simulator and write its histogram")
+    simulators = simulate_parser.add_subparsers(dest="simulator", required=True)
+    for name, fn in SIMULATORS.items():
+        sub = simulators.add_parser(name)
+        sub.add_argument("-n", "--particles", type=int, default=3000)
+        sub.add_argument("--seed", type=int, default=None)
+        sub.add_argument("--shards", type=int, default=None,
+                         help="split the run over this many independent RNG streams in a process pool")
+        sub.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+        sub.add_argument("--chunk", type=int, default=CHUNK,
+                         help="particles per chunk, the unit of shards and particle ranges")
+        sub.add_argument("--range", type=int, nargs=2, default=None, metavar=("START", "STOP"),
+                         help="only regenerate the chunks covering particles START..STOP of the run")
+        sub.add_argument("-o", "--out", required=True, help="output file (.npz, .json or .csv)")
+        _add_simulator_options(sub, fn)
+
+    detect_parser = commands.add_parser("detect2d", help="run a 2-D detector screen")
+    detect_parser.add_argument("-n", "--particles", type=int, default=3000)
+    detect_parser.add_argument("--seed", type=int, default=None)
+    detect_parser.add_argument("--shape", type=int, nargs=2, default=(512, 512), metavar=("ROWS", "COLS"))
+    detect_parser.add_argument("--storage", choices=("auto", "dense", "sparse"), default="auto")
+    detect_parser.add_argument("-o", "--out", required=True,
+                               help=".npy (dense counts, memory-mapped while running) or .npz (sparse COO)")
+    _add_simulator_options(detect_parser, detect_2d, skip=("shape", "storage", "chunk"))
+
+    sweep_parser = commands.add_parser("sweep", help="run a simulator over a parameter grid into one columnar file")
+    sweep_parser.add_argument("simulator", choices=SIMULATORS)
+    sweep_parser.add_argument("--grid", action="append", default=[], metavar="PARAM=VALUES",
+                              help="axis as a,b,c or start:stop:count (repeat for a grid; n is a parameter too)")
+    sweep_parser.add_argument("-n", "--particles", type=int, default=3000, help="particles when n is not swept")
+    sweep_parser.add_argument("--seed", type=int, default=None)
+    sweep_parser.add_argument("-o", "--out", required=True, help="output file (.npz or .parquet)")
+
+    store_parser = commands.add_parser("store", help="inspect or empty the disk result store ($RCE_STORE)")
+    store_parser.add_argument("action", choices=("stats", "clear"))
+    store_parser.add_argument("--root", default=None, help="store directory (default: $RCE_STORE)")
+
+    bench_parser = commands.add_parser("bench", help="time and profile every simulator and rendering path")
+    bench_parser.add_argument("cases", nargs="*", metavar="CASE", help=f"any of: {', '.join(bench.BENCHMARKS)}")
+    bench_parser.add_argument("--max-scale", type=float, default=None,
+                              help="skip scales (particles, slits, points) above this")
+    bench_parser.add_argument("--repeats", type=int, default=3, help="timed runs per case; the best is kept")
+    bench_parser.add_argument("--no-memory", dest="memory", action="store_false",
+                              help="skip the tracemalloc run")
+    bench_parser.add_argument("--imports", action="store_true",
+                              help="also time cold imports (per module, cumulative) in fresh interpreters")
+    bench_parser.add_argument("--app", dest="apps", action="append", default=[], metavar="SCRIPT",
+                              help="time this app's top-level import block too (implies --imports)")
+    bench_parser.add_argument("--imports-only", action="store_true", help="skip the simulator and figure cases")
+    bench_parser.add_argument("--history", default=bench.HISTORY, help="JSON history the run is appended to")
+    bench_parser.add_argument("--baseline", default=bench.BASELINE, help="JSON baseline to compare against")
+    bench_parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    bench_parser.add_argument("--tolerance", type=float, default=0.25,
+                              help="relative growth flagged as a regression (default: 0.25)")
+    return parser
+
+
+def _detect(args):
+    n, seed, out = args.pop("particles"), args.pop("seed"), pathlib.Path(args.pop("out"))
+    out.parent.mkdir(parents=True, exist_ok=True)
+    shape, storage = tuple(args.pop("shape")), args.pop("storage")
+    path = str(out) if out.suffix == ".npy" else None
+    acc, x_edges, y_edges = detect_2d(n, shape, storage="dense" if path else storage, path=path,
+                                      rng=seed, **args)
+    if path is None:
+        rows, cols, counts = acc.coo()
+        meta = {"particles": n, "seed": seed, "shape": shape, **args}
+        np.savez(out, rows=rows, cols=cols, counts=counts, x_edges=x_edges, y_edges=y_edges, meta=json.dumps(meta))
+    print(f"detect2d: {acc.total()} hits on {shape[0]}x{shape[1]} -> {out}", file=sys.stderr)
+    return 0
+
+
+def _simulate(args):
+    name, n, out = args.pop("simulator"), args.pop("particles"), args.pop("out")
+    shards, workers, chunk, particles = args.pop("shards"), args.pop("workers"), args.pop("chunk"), args.pop("range")
+    # An unseeded run draws fresh entropy, recorded in the output as its seed
+    given = args.pop("seed")
+    seed = CounterRNG(given).seed
+    meta = {"simulator": name, "particles": n, "seed": seed, "chunk": chunk, "shards": shards, **args}
+    if particles:
+        counts, edges, covered = simulate_range(name, *particles, n, seed, chunk, **args)
+        meta["range"] = covered
+    elif shards:
+        counts, edges = simulate_sharded(name, n, seed, shards, workers, chunk, **args)
+    elif given is not None and RESULTS.store is not None:
+        # Seeded runs are shared with every process using the same $RCE_STORE
+        counts, edges = cached_simulate(name, n, seed, chunk, **args)
+    else:
+        counts, edges = simulate(name, n, seed, chunk, **args)
+
+    path = write_result(out, counts, edges, meta)
+    print(f"{name}: {int(counts.sum())} hits in {len(counts)} bins -> {path}", file=sys.stderr)
+    return 0
+
+
+def _sweep(args):
+    name, seed = args["simulator"], args["seed"]
+    grid = parse_grid(name, args["grid"])
+    columns = sweep(name, grid, args["particles"], seed)
+    meta = {"simulator": name, "seed": seed, "grid": sorted(grid), "particles": args["particles"]}
+    path = write_sweep(args["out"], columns, meta)
+    print(f"sweep {name}: {len(columns['n'])} configurations x {columns['counts'].shape[1]} bins -> {path}",
+          file=sys.stderr)
+    return 0
+
+
+def _store(args):
+    store = open_store(args["root"])
+    if store is None:
+        raise ValueError("No result store: set RCE_STORE or pass --root")
+    if args["action"] == "clear":
+        store.clear()
+    print(json.dumps(store.stats(), indent=1))
+    return 0
+
+
+def _bench(args):
+    results = []
+    if not args["imports_only"]:
+        results = bench.run(args["cases"], args["max_scale"], args["repeats"], args["memory"])
+        print(bench.format_results(results))
+    if args["imports"] or args["imports_only"] or args["apps"]:
+        imports = bench.run_imports(apps=args["apps"])
+        print(bench.format_imports(imports))
+        results += imports
+    history = bench.record(results, args["history"])
+    print(f"bench: {len(results)} measurements appended to {history}", file=sys.stderr)
+
+    status = 0
+    baseline = bench.load_baseline(args["baseline"])
+    if baseline is None:
+        print(f"bench: no baseline at {args['baseline']}", file=sys.stderr)
+    else:
+        regressions = bench.compare(results, baseline, args["tolerance"])
+        for r in regressions:
+            print(f"REGRESSION {r['case']} @ {r['scale']}: {r['metric']} {r['baseline']:.6g} -> "
+                  f"{r['current']:.6g} (x{r['ratio']:.2f})", file=sys.stderr)
+        status = 1 if regressions else 0
+    if args["save_baseline"]:
+        print(f"bench: baseline saved to {bench.save_baseline(results, args['baseline'])}", file=sys.stderr)
+    return status
+
+
+COMMANDS = {"simulate": _simulate, "detect2d": _detect, "sweep": _sweep, "store": _store, "bench": _bench}
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = vars(parser.parse_args(argv))
+    try:
+        return COMMANDS[args.pop("command")](args)
+    except ValueError as exc:
+        parser.error(str(exc))
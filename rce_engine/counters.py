@@ -0,0 +1,55 @@
+import numpy as np
+
+# Stream keys of a run: the setup draws (bins, noise realisation), the
+# particles and their arrival order (animation frames)
+SETUP, PARTICLES, ARRIVALS = 0, 1, 2
+
+
+# --- Counter-based generator ---
+# Philox keyed by (seed, stream) and addressed by counter: block k of a stream
+# starts at counter k << 192, so any block is drawn directly, without
+# generating the ones before it, and no two blocks can overlap. A run of n
+# particles in chunks of c draws its k-th chunk from block k: particles
+# [k·c, (k + 1)·c) are regenerated in O(c), anywhere in the run, and workers
+# splitting a run by chunks need nothing from each other but the seed.
+class CounterRNG:
+    def __init__(self, seed=None):
+        # Without a seed, fresh entropy is drawn and kept: the run stays
+        # reproducible from rng.seed
+        self.seed = np.random.SeedSequence().entropy if seed is None else seed
+        self._keys = {}
+
+    def __repr__(self):
+        return f"CounterRNG({self.seed!r})"
+
+    def key(self, stream):
+        if stream not in self._keys:
+            sequence = np.random.SeedSequence(self.seed, spawn_key=(stream,))
+            self._keys[stream] = sequence.generate_state(2, np.uint64)
+        return self._keys[stream]
+
+    def generator(self, stream=PARTICLES, block=0):
+        counter = np.array([0, 0, 0, block], dtype=np.uint64)
+        return np.random.Generator(np.random.Philox(counter=counter, key=self.key(stream)))
+
+    def setup(self):
+        return self.generator(SETUP)
+
+    def block(self, k):
+        return self.generator(PARTICLES, k)
+
+
+def counter_rng(rng):
+    # A CounterRNG from a seed, None or a CounterRNG; None for a plain
+    # Generator, which callers consume sequentially as before
+    if isinstance(rng, np.random.Generator):
+        return None
+    return rng if isinstance(rng, CounterRNG) else CounterRNG(rng)
+
+
+def blocks(start, stop, n, chunk):
+    # (block, first particle, particles) of every chunk of an n-particle run
+    # overlapping [start, stop)
+    stop = min(stop, n)
+    for k in range(max(start, 0) // chunk, -(-stop // chunk) if stop > 0 else 0):
+        yield k, k * chunk, min(chunk, n - k * chunk)
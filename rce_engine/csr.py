@@ -0,0 +1,104 @@
+import numpy as np
+
+
+# --- Array-backed coherence graph ---
+# Nodes are integer ids into a label table; the out-arcs of node i are
+# indices[indptr[i]:indptr[i + 1]], with their coherence weights in the
+# float32 array mu. Undirected graphs store each edge once. Eight bytes per
+# edge instead of networkx's dict-of-dicts, so millions of edges fit easily.
+# nodes(), edges() and is_directed() follow networkx, which is all that
+# layout, drawing and the path solver need.
+class CoherenceGraph:
+    weight = "mu"
+
+    def __init__(self, labels, indptr, indices, mu=None, directed=True):
+        self.labels = list(labels)
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.mu = np.ones(len(self.indices), np.float32) if mu is None else np.asarray(mu, np.float32)
+        self.directed = directed
+        self._index = None
+        if len(self.indptr) != len(self.labels) + 1 or self.indptr[-1] != len(self.indices):
+            raise ValueError("indptr does not match the label table and indices")
+        if len(self.mu) != len(self.indices):
+            raise ValueError("mu needs one weight per edge")
+
+    @classmethod
+    def from_edges(cls, labels, src, dst, mu=None, directed=True):
+        src = np.asarray(src)
+        order = np.argsort(src, kind="stable")
+        indptr = np.zeros(len(labels) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=len(labels)), out=indptr[1:])
+        mu = None if mu is None else np.asarray(mu)[order]
+        return cls(labels, indptr, np.asarray(dst)[order], mu, directed)
+
+    @classmethod
+    def from_networkx(cls, G, weight="mu"):
+        labels = list(G.nodes())
+        index = {node: i for i, node in enumerate(labels)}
+        edges = list(G.edges(data=weight, default=1.0))
+        src = [index[u] for u, _, _ in edges]
+        dst = [index[v] for _, v, _ in edges]
+        mu = [m for _, _, m in edges]
+        return cls.from_edges(labels, np.array(src, dtype=np.int64), dst, mu, G.is_directed())
+
+    def to_networkx(self):
+        # networkx only loads when a graph is converted (layouts, plain drawing)
+        import networkx as nx
+        G = nx.DiGraph() if self.directed else nx.Graph()
+        G.add_nodes_from(self.labels)
+        G.add_weighted_edges_from(self.edges(data=self.weight), weight=self.weight)
+        return G
+
+    # --- Array views ---
+    def sources(self):
+        # Source id of every stored edge, aligned with indices and mu
+        return np.repeat(np.arange(len(self.labels), dtype=np.int32), np.diff(self.indptr))
+
+    def index(self, label):
+        if self._index is None:
+            self._index = {node: i for i, node in enumerate(self.labels)}
+        return self._index[label]
+
+    def successors(self, label):
+        i = self.index(label)
+        return [self.labels[j] for j in self.indices[self.indptr[i]:self.indptr[i + 1]]]
+
+    @property
+    def nbytes(self):
+        return self.indptr.nbytes + self.indices.nbytes + self.mu.nbytes
+
+    # --- networkx-compatible views ---
+    def nodes(self):
+        return list(self.labels)
+
+    def edges(self, data=False, default=None):
+        labels = self.labels
+        pairs = zip(self.sources().tolist(), self.indices.tolist())
+        if data is False or data is None:
+            return ((labels[u], labels[v]) for u, v in pairs)
+        if data is True:
+            return ((labels[u], labels[v], {self.weight: m}) for (u, v), m in zip(pairs, self.mu.tolist()))
+        if data == self.weight:
+            return ((labels[u], labels[v], m) for (u, v), m in zip(pairs, self.mu.tolist()))
+        return ((labels[u], labels[v], default) for u, v in pairs)
+
+    def is_directed(self):
+        return self.directed
+
+    def number_of_nodes(self):
+        return len(self.labels)
+
+    def number_of_edges(self):
+        return len(self.indices)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __iter__(self):
+        return iter(self.labels)
+
+    def __contains__(self, label):
+        if self._index is None:
+            self._index = {node: i for i, node in enumerate(self.labels)}
+        return label in self._index
@@ -0,0 +1,141 @@
+import numpy as np
+
+from .counters import blocks, counter_rng
+from .fraunhofer import aperture_mask, far_field_screen, grating_mask
+from .perf import span
+from .simulators import CHUNK
+
+# Above this many cells a dense accumulator is better kept on disk
+DENSE_MAX_CELLS = 4096 * 4096
+
+
+# --- Hit accumulators ---
+# Both take flat cell indices chunk by chunk; only the cells a chunk touched
+# are updated, so no full-screen temporary is ever allocated.
+class DenseAccumulator:
+    # uint32 counts in RAM, or in a memory-mapped .npy file when path is given
+    def __init__(self, shape, path=None):
+        self.shape = tuple(shape)
+        if path is None:
+            self.counts = np.zeros(self.shape, dtype=np.uint32)
+        else:
+            self.counts = np.lib.format.open_memmap(path, mode="w+", dtype=np.uint32, shape=self.shape)
+        self.path = path
+
+    def add(self, flat):
+        cells, counts = np.unique(flat, return_counts=True)
+        self.counts.reshape(-1)[cells] += counts.astype(np.uint32)
+
+    def coo(self):
+        rows, cols = np.nonzero(self.counts)
+        return rows, cols, self.counts[rows, cols]
+
+    def total(self):
+        return int(self.counts.sum(dtype=np.uint64))
+
+    def downsample(self, shape):
+        fy, fx = self.shape[0] // shape[0], self.shape[1] // shape[1]
+        rows = self.counts[:fy * shape[0], :fx * shape[1]]
+        # One band of rows at a time, so a memmap is streamed rather than loaded
+        return np.stack([rows[i * fy:(i + 1) * fy].reshape(fy, shape[1], fx).sum(axis=(0, 2), dtype=np.uint64)
+                         for i in range(shape[0])])
+
+    def flush(self):
+        if self.path is not None:
+            self.counts.flush()
+
+
+class SparseAccumulator:
+    # COO accumulator: (flat cell, count) pairs, merged whenever the pending
+    # chunks outgrow the compacted table. Memory follows the touched cells.
+    def __init__(self, shape):
+        self.shape = tuple(shape)
+        self.cells = np.empty(0, dtype=np.int64)
+        self.values = np.empty(0, dtype=np.uint64)
+        self._pending = []
+        self._pending_size = 0
+
+    def add(self, flat):
+        cells, counts = np.unique(flat, return_counts=True)
+        self._pending.append((cells, counts.astype(np.uint64)))
+        self._pending_size += len(cells)
+        if self._pending_size > max(len(self.cells), CHUNK):
+            self._compact()
+
+    def _compact(self):
+        if not self._pending:
+            return
+        cells = np.concatenate([self.cells, *(c for c, _ in self._pending)])
+        values = np.concatenate([self.values, *(v for _, v in self._pending)])
+        order = np.argsort(cells, kind="stable")
+        cells = cells[order]
+        starts = np.flatnonzero(np.r_[True, cells[1:] != cells[:-1]])
+        self.cells, self.values = cells[starts], np.add.reduceat(values[order], starts)
+        self._pending, self._pending_size = [], 0
+
+    def coo(self):
+        # (rows, cols, counts)
+        self._compact()
+        rows, cols = np.divmod(self.cells, self.shape[1])
+        return rows, cols, self.values
+
+    def total(self):
+        self._compact()
+        return int(self.values.sum())
+
+    def downsample(self, shape):
+        rows, cols, values = self.coo()
+        fy, fx = self.shape[0] // shape[0], self.shape[1] // shape[1]
+        keep = (rows < fy * shape[0]) & (cols < fx * shape[1])
+        flat = (rows[keep] // fy) * shape[1] + cols[keep] // fx
+        return np.bincount(flat, weights=values[keep], minlength=shape[0] * shape[1]).reshape(shape)
+
+    def flush(self):
+        self._compact()
+
+
+def accumulator(shape, storage="auto", path=None):
+    # "dense" (RAM, or memmap if path), "sparse", or "auto": memmap when a
+    # path is given, sparse for screens above DENSE_MAX_CELLS, dense otherwise
+    if storage == "auto":
+        storage = "dense" if path is not None or shape[0] * shape[1] <= DENSE_MAX_CELLS else "sparse"
+    if storage == "dense":
+        return DenseAccumulator(shape, path)
+    if storage == "sparse":
+        return SparseAccumulator(shape)
+    raise ValueError(f"Unknown accumulator storage: {storage!r}")
+
+
+# --- Separable 2-D screen ---
+# Rectangular slits factor the far field into I(x, y) = Ix(x) · Iy(y): the
+# grating across x, a single slit of the given height along y. Each marginal
+# is integrated over its bins, then every hit draws its column and row.
+def screen_2d(shape=(512, 512), slits=2, width=0.02, spacing=0.1, height=0.1, wavelength=0.02):
+    rows, cols = shape
+    x, ix = far_field_screen(*grating_mask(slits, width, spacing), wavelength, points=max(4096, 4 * cols))
+    dy = height / 8
+    y, iy = far_field_screen(aperture_mask(0.0, height, dy), dy, wavelength, points=max(4096, 4 * rows))
+    px, x_edges = np.histogram(x, bins=cols, range=(-1, 1), weights=ix)
+    py, y_edges = np.histogram(y, bins=rows, range=(-1, 1), weights=iy)
+    return px / px.sum(), py / py.sum(), x_edges, y_edges
+
+
+def _draw_bins(cdf, n, rng):
+    return np.minimum(np.searchsorted(cdf, rng.random(n), side="right"), len(cdf) - 1)
+
+
+def detect_2d(n, shape=(512, 512), slits=2, width=0.02, spacing=0.1, height=0.1, wavelength=0.02,
+              storage="auto", path=None, chunk=CHUNK, rng=None):
+    # Chunk k draws from counter block k, as in simulators.stream
+    counters = counter_rng(rng)
+    px, py, x_edges, y_edges = screen_2d(shape, slits, width, spacing, height, wavelength)
+    cdf_x, cdf_y = np.cumsum(px), np.cumsum(py)
+    acc = accumulator(shape, storage, path)
+    for k, _, step in blocks(0, n, n, chunk):
+        generator = rng if counters is None else counters.block(k)
+        with span("simulate"):
+            flat = _draw_bins(cdf_y, step, generator) * shape[1] + _draw_bins(cdf_x, step, generator)
+        with span("histogram"):
+            acc.add(flat)
+    acc.flush()
+    return acc, x_edges, y_edges
@@ -0,0 +1,168 @@
+import numpy as np
+import plotly.graph_objects as go
+
+from .sampling import bin_centres
+
+# Points above which a trace is drawn with WebGL (Scattergl)
+WEBGL_THRESHOLD = 1000
+# Horizontal pixel buckets lines and bars are reduced to
+CHART_WIDTH = 1000
+# Bars of an animated screen: every frame resends them all
+ANIMATION_WIDTH = 250
+
+
+# --- Compact traces ---
+# float32 numpy arrays are sent to the browser as base64 typed arrays, so
+# the payload grows with the chart width, never with the screen resolution.
+def _compact(values):
+    return np.asarray(values, dtype=np.float32)
+
+
+def decimate_minmax(x, y, buckets=CHART_WIDTH):
+    # Keep the lowest and highest point of each bucket: no fringe peak is lost
+    n = len(y)
+    if n <= 2 * buckets:
+        return x, y
+    bucket = np.arange(n) * buckets // n
+    order = np.lexsort((y, bucket))
+    starts = np.searchsorted(bucket, np.arange(buckets))
+    ends = np.append(starts[1:], n) - 1
+    keep = np.unique(np.concatenate([order[starts], order[ends]]))
+    return x[keep], y[keep]
+
+
+def decimate_lttb(x, y, points=2 * CHART_WIDTH):
+    # Largest-Triangle-Three-Buckets: one point per bucket, the one spanning
+    # the largest triangle with the previous pick and the next bucket's mean
+    n = len(y)
+    if n <= points or points < 3:
+        return x, y
+    edges = np.linspace(1, n - 1, points - 1).astype(int)
+    keep = np.empty(points, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nxt = slice(hi, edges[i + 2] if i + 2 < len(edges) else n)
+        mean_x, mean_y = x[nxt].mean(), y[nxt].mean()
+        area = np.abs((x[a] - mean_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (mean_y - y[a]))
+        a = keep[i + 1] = lo + int(np.argmax(area))
+    return x[keep], y[keep]
+
+
+DECIMATORS = {"minmax": decimate_minmax, "lttb": lambda x, y, width: decimate_lttb(x, y, 2 * width)}
+
+
+def line_trace(x, y, width=CHART_WIDTH, method="minmax", **kwargs):
+    x, y = np.asarray(x), np.asarray(y)
+    if method is not None:
+        if method not in DECIMATORS:
+            raise ValueError(f"Unknown decimation method: {method!r}")
+        x, y = DECIMATORS[method](x, y, width)
+    trace = go.Scattergl if len(y) > WEBGL_THRESHOLD else go.Scatter
+    return trace(x=_compact(x), y=_compact(y), **kwargs)
+
+
+def rebin(counts, edges, max_bins=CHART_WIDTH):
+    # Sum runs of adjacent bins along the last axis (counts are preserved, the
+    # last bin may be short)
+    factor = -(-counts.shape[-1] // max_bins)
+    if factor <= 1:
+        return counts, edges
+    pad = [(0, 0)] * (counts.ndim - 1) + [(0, (-counts.shape[-1]) % factor)]
+    counts = np.pad(counts, pad).reshape(*counts.shape[:-1], -1, factor).sum(axis=-1)
+    return counts, np.append(edges[:-1:factor], edges[-1])
+
+
+def bar_trace(counts, edges, width=CHART_WIDTH, **kwargs):
+    counts, edges = rebin(np.asarray(counts), np.asarray(edges), width)
+    return go.Bar(x=_compact(bin_centres(edges)), y=_compact(counts), **kwargs)
+
+
+def _scatter(points):
+    return go.Scattergl if points > WEBGL_THRESHOLD else go.Scatter
+
+
+# --- Detector screen ---
+def plot_distribution(counts, edges, title):
+    fig = go.Figure()
+    fig.add_trace(bar_trace(counts, edges, marker_color='blue'))
+    fig.update_layout(title=title, xaxis_title="Screen position", yaxis_title="Count", height=400)
+    return fig
+
+
+# --- Arrival animation ---
+# Built from the frame deltas of animation.arrivals: x, the axes and the
+# buttons are sent once, and each frame carries only the bar heights of the
+# one trace, as a typed array of the smallest integer type that fits. The y
+# range is fixed to the final screen so frames play without relayout.
+def plot_arrivals(deltas, edges, bounds, title, width=ANIMATION_WIDTH, duration=40):
+    deltas, edges = rebin(np.asarray(deltas), np.asarray(edges), width)
+    screens = np.cumsum(deltas, axis=0, dtype=np.int64)
+    screens = screens.astype(np.min_scalar_type(int(screens.max(initial=0))))
+    top = max(int(screens[-1].max(initial=0)), 1) * 1.05
+
+    fig = go.Figure(go.Bar(x=_compact(bin_centres(edges)), y=screens[0], marker_color='blue'))
+    fig.frames = [go.Frame(data=[go.Bar(y=screen)], traces=[0], name=str(i),
+                           layout=dict(title_text=f"{title} ({done:,} particles)"))
+                  for i, (screen, done) in enumerate(zip(screens, bounds))]
+    play = dict(frame=dict(duration=duration, redraw=False), transition=dict(duration=0), fromcurrent=True)
+    pause = dict(frame=dict(duration=0, redraw=False), mode="immediate")
+    fig.update_layout(
+        title=f"{title} ({bounds[0]:,} particles)", xaxis_title="Screen position", yaxis_title="Count",
+        yaxis_range=[0, top], height=400,
+        updatemenus=[dict(type="buttons", direction="left", x=0, y=1.15, xanchor="left", buttons=[
+            dict(label="▶ Play", method="animate", args=[None, play]),
+            dict(label="⏸ Pause", method="animate", args=[[None], pause]),
+        ])],
+    )
+    return fig
+
+
+def plot_heatmap(image, x_edges, y_edges, title):
+    # image: (rows, cols) counts, already downsampled to display size
+    fig = go.Figure(go.Heatmap(z=image, x=bin_centres(x_edges), y=bin_centres(y_edges), colorscale="Viridis"))
+    fig.update_layout(title=title, xaxis_title="Screen x", yaxis_title="Screen y", height=500)
+    return fig
+
+
+# --- Coherence graphs ---
+# .graphs (and networkx with it) is imported on the first graph drawn, so
+# screen-only pages never load it. pos defaults to the shared layout cache; a
+# LiveGraph's positions keep nodes in place from one drawing to the next.
+def plot_rce_graph(left, right, detector_left, detector_right, pos=None):
+    from .graphs import edge_segments, layout, node_coordinates, rce_graph
+    G = rce_graph(left, right, detector_left, detector_right)
+    pos = layout(G) if pos is None else pos
+    edge_x, edge_y = edge_segments(G, pos)
+    node_x, node_y, node_text = node_coordinates(G, pos)
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=edge_x, y=edge_y,
+                             line=dict(width=1, color='gray'),
+                             hoverinfo='none',
+                             mode='lines'))
+    fig.add_trace(go.Scatter(x=node_x, y=node_y,
+                             mode='markers+text',
+                             marker=dict(size=40, color='skyblue'),
+                             text=node_text,
+                             textposition="top center"))
+    fig.update_layout(title="RCE – Coherence Graph", height=400,
+                      xaxis=dict(visible=False), yaxis=dict(visible=False))
+    return fig
+
+
+def plot_coherence_graph(G, pos=None):
+    from .graphs import edge_segments, layout, node_coordinates
+    pos = layout(G) if pos is None else pos
+    edge_x, edge_y = edge_segments(G, pos)
+    node_x, node_y, node_text = node_coordinates(G, pos)
+
+    edge_trace = _scatter(len(edge_x))(x=edge_x, y=edge_y, line=dict(width=1), hoverinfo='none', mode='lines')
+    node_trace = _scatter(len(node_x))(
+        x=node_x, y=node_y, mode='markers+text', text=node_text, textposition='top center',
+        hoverinfo='text', marker=dict(size=30, color='lightblue', line=dict(width=2)))
+
+    fig = go.Figure(data=[edge_trace, node_trace])
+    fig.update_layout(showlegend=False, margin=dict(l=20, r=20, t=40, b=20), height=400)
+    return fig
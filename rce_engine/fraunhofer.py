@@ -0,0 +1,74 @@
+import collections
+import hashlib
+import threading
+
+import numpy as np
+
+# Aperture samples across the narrowest slit of a generated mask
+SAMPLES_PER_WIDTH = 8
+
+FAR_FIELD_CACHE_SIZE = 64
+
+
+# --- Aperture masks ---
+# 1-D transmission on a regular grid of step dx; slits are written through a
+# difference array, so N slits cost O(M + N) whatever their widths.
+def aperture_mask(centres, widths, dx):
+    centres, widths = np.broadcast_arrays(np.asarray(centres, float), np.asarray(widths, float))
+    lo = (centres - widths / 2).min()
+    size = int(np.ceil(((centres + widths / 2).max() - lo) / dx))
+    start = np.floor((centres - widths / 2 - lo) / dx + 0.5).astype(int)
+    stop = np.floor((centres + widths / 2 - lo) / dx + 0.5).astype(int)
+
+    steps = np.zeros(size + 1)
+    np.add.at(steps, start, 1)
+    np.add.at(steps, stop, -1)
+    return (np.cumsum(steps[:-1]) > 0).astype(float)
+
+
+def grating_mask(slits, width=0.02, spacing=0.1, dx=None):
+    # slits equal slits, centred on 0
+    dx = width / SAMPLES_PER_WIDTH if dx is None else dx
+    centres = (np.arange(slits) - (slits - 1) / 2) * spacing
+    return aperture_mask(centres, width, dx), dx
+
+
+# --- Far field ---
+# |FFT|² of the zero-padded mask, fftshifted: intensity against spatial
+# frequency u (cycles per aperture unit), normalised to a peak of 1. The FFT
+# length is a power of two at least pad × the mask, and at least size samples.
+# Results are cached per mask, so re-sampling the same grating is free.
+_far_fields = collections.OrderedDict()
+_far_fields_lock = threading.Lock()
+
+
+def far_field(mask, dx, pad=4, size=0):
+    mask = np.asarray(mask, dtype=float)
+    key = (hashlib.sha1(mask.tobytes()).hexdigest(), mask.size, dx, pad, size)
+    with _far_fields_lock:
+        if key in _far_fields:
+            _far_fields.move_to_end(key)
+            return _far_fields[key]
+
+    n_fft = 1 << int(np.ceil(np.log2(max(pad * mask.size, size, 2))))
+    intensity = np.abs(np.fft.fftshift(np.fft.fft(mask, n=n_fft))) ** 2
+    intensity /= intensity.max() or 1.0
+    u = np.fft.fftshift(np.fft.fftfreq(n_fft, d=dx))
+    u.flags.writeable = intensity.flags.writeable = False
+
+    with _far_fields_lock:
+        _far_fields[key] = (u, intensity)
+        while len(_far_fields) > FAR_FIELD_CACHE_SIZE:
+            _far_fields.popitem(last=False)
+    return u, intensity
+
+
+def far_field_screen(mask, dx, wavelength=0.02, points=4096, pad=4, range=(-1, 1)):
+    # Small-angle screen position x = λ·L·u, with wavelength standing for the
+    # product λ·L in screen units. The FFT is padded until the screen range
+    # holds at least points samples, ready for sample_screen.
+    size = int(points * wavelength / (dx * (range[1] - range[0])))
+    u, intensity = far_field(mask, dx, pad, size)
+    x = wavelength * u
+    keep = (x >= range[0]) & (x <= range[1])
+    return x[keep], intensity[keep]
@@ -0,0 +1,223 @@
+import collections
+import hashlib
+import itertools
+import threading
+
+import networkx as nx
+import numpy as np
+
+from .csr import CoherenceGraph
+from .perf import span
+
+# Context label -> (slit node, outcome node) of the single-context graphs of
+# rce_fentes.py / rce_fentes_v2.py (French) and rce_fentes_rce_vs_quantum.py
+CONTEXTS = {
+    "Fente gauche ouverte": ("Fente gauche ouverte", "Impact sur l'écran (gauche)"),
+    "Fente droite ouverte": ("Fente droite ouverte", "Impact sur l'écran (droite)"),
+    "Les deux fentes ouvertes": ("Les deux fentes ouvertes", "Interférence"),
+    "Left slit open": ("Left slit", "Impact on screen (left)"),
+    "Right slit open": ("Right slit", "Impact on screen (right)"),
+    "Both slits open": ("Both slits", "Interference pattern"),
+}
+
+
+# --- Coherence-graph builders ---
+def build_graph(context):
+    G = nx.DiGraph()
+    G.add_node("Source")
+    if context in CONTEXTS:
+        slit, outcome = CONTEXTS[context]
+        G.add_edge("Source", slit)
+        G.add_edge(slit, outcome)
+    return G
+
+
+def rce_graph(left, right, detector_left=False, detector_right=False):
+    # rce_fentes_pro: a detector cuts the path through its slit
+    G = nx.DiGraph()
+    G.add_node("Source")
+
+    if left:
+        G.add_node("Left slit")
+        if not detector_left:
+            G.add_edge("Source", "Left slit")
+            G.add_edge("Left slit", "Hit (left)")
+
+    if right:
+        G.add_node("Right slit")
+        if not detector_right:
+            G.add_edge("Source", "Right slit")
+            G.add_edge("Right slit", "Hit (right)")
+
+    if left and right and not (detector_left or detector_right):
+        G.add_edge("Source", "Interference")
+    return G
+
+
+def relational_graph(left_open, right_open, interference=False):
+    # v2.1: the interference node links both hits when coherence is kept
+    G = nx.Graph()
+    G.add_node("Source")
+    if left_open:
+        G.add_edge("Source", "Left slit")
+        G.add_edge("Left slit", "Hit (left)")
+    if right_open:
+        G.add_edge("Source", "Right slit")
+        G.add_edge("Right slit", "Hit (right)")
+    if left_open and right_open and interference:
+        G.add_edge("Source", "Interference")
+        G.add_edge("Interference", "Hit (left)")
+        G.add_edge("Interference", "Hit (right)")
+    return G
+
+
+def generate_coherence_graph(left_open, right_open):
+    # v2.6 / v2.7
+    G = nx.Graph()
+    G.add_node("Source")
+    if left_open:
+        G.add_edge("Source", "Left slit")
+        G.add_edge("Left slit", "Hit (left)")
+    if right_open:
+        G.add_edge("Source", "Right slit")
+        G.add_edge("Right slit", "Hit (right)")
+    G.add_edge("Source", "Interference")
+    return G
+
+
+def static_coherence_graph():
+    # v2.2 / v2.4 / v2.5: every potential node, whatever the slits
+    G = nx.DiGraph()
+    G.add_nodes_from(["Source", "Left slit", "Right slit", "Hit (left)", "Hit (right)", "Interference"])
+    G.add_edges_from([
+        ("Source", "Left slit"),
+        ("Source", "Right slit"),
+        ("Left slit", "Hit (left)"),
+        ("Right slit", "Hit (right)"),
+        ("Source", "Interference"),
+    ])
+    return G
+
+
+def weighted_coherence_graph():
+    # v2.3: coherence weights μ ∈ [0,1] on every edge
+    G = nx.DiGraph()
+    G.add_edges_from([
+        ("Source", "Left slit", {"mu": 0.9}),
+        ("Source", "Right slit", {"mu": 0.9}),
+        ("Left slit", "Hit (left)", {"mu": 0.7}),
+        ("Right slit", "Hit (right)", {"mu": 0.7}),
+        ("Source", "Interference", {"mu": 0.3}),
+        ("Interference", "Hit (left)", {"mu": 0.2}),
+        ("Interference", "Hit (right)", {"mu": 0.2}),
+    ])
+    return G
+
+
+def grating_graph(slits, detectors=1000, spread=0.2):
+    # Many-slit grating: Source -> every slit -> every detector position, μ
+    # falling off with the slit-detector distance. Built straight into CSR
+    # arrays (slits × detectors edges).
+    slit_x = np.linspace(-1, 1, slits)
+    hit_x = np.linspace(-1, 1, detectors)
+    labels = ["Source"] + [f"Slit {i}" for i in range(slits)] + [f"Hit {j}" for j in range(detectors)]
+    indptr = np.concatenate([[0, slits], slits + detectors * np.arange(1, slits + 1),
+                             np.full(detectors, slits + detectors * slits)])
+    indices = np.concatenate([np.arange(1, slits + 1), np.tile(np.arange(slits + 1, slits + 1 + detectors), slits)])
+    mu = np.exp(-0.5 * ((hit_x[None, :] - slit_x[:, None]) / spread) ** 2)
+    return CoherenceGraph(labels, indptr, indices, np.concatenate([np.ones(slits), mu.ravel()]))
+
+
+# --- Layout cache ---
+# Positions are shared by every session of the process and keyed by a
+# canonical hash of the graph's nodes and edges, so a topology is laid out
+# once whatever order its nodes were added in.
+LAYOUT_CACHE_SIZE = 1024
+
+_layouts = collections.OrderedDict()
+_layouts_lock = threading.Lock()
+
+
+def topology_key(G):
+    if isinstance(G, CoherenceGraph):
+        digest = hashlib.sha1(repr((G.directed, G.labels)).encode())
+        digest.update(G.indptr.tobytes())
+        digest.update(G.indices.tobytes())
+        return digest.hexdigest()
+    directed = G.is_directed()
+    edges = ((str(u), str(v)) if directed else tuple(sorted((str(u), str(v)))) for u, v in G.edges())
+    canonical = repr((directed, sorted(map(str, G.nodes())), sorted(edges)))
+    return hashlib.sha1(canonical.encode()).hexdigest()
+
+
+def layout(G, seed=42):
+    with span("layout"):
+        key = (topology_key(G), seed)
+        with _layouts_lock:
+            if key in _layouts:
+                _layouts.move_to_end(key)
+                return dict(_layouts[key])
+        pos = nx.spring_layout(G.to_networkx() if isinstance(G, CoherenceGraph) else G, seed=seed)
+        with _layouts_lock:
+            _layouts[key] = pos
+            while len(_layouts) > LAYOUT_CACHE_SIZE:
+                _layouts.popitem(last=False)
+        return dict(pos)
+
+
+def known_graphs():
+    # Every topology the builders above can produce from the apps' controls
+    flags = (False, True)
+    yield from (build_graph(context) for context in CONTEXTS)
+    yield from (rce_graph(*f) for f in itertools.product(flags, repeat=4))
+    yield from (relational_graph(*f) for f in itertools.product(flags, repeat=3))
+    yield from (generate_coherence_graph(*f) for f in itertools.product(flags, repeat=2))
+    yield static_coherence_graph()
+    yield weighted_coherence_graph()
+
+
+_warmed = False
+
+
+def warm_layouts(seed=42):
+    global _warmed
+    if not _warmed:
+        for G in known_graphs():
+            layout(G, seed)
+        _warmed = True
+    return len(_layouts)
+
+
+# --- Drawing coordinates ---
+def edge_coordinates(G, pos, edges=None):
+    # Segments separated by None, as expected by a single Plotly line trace
+    edge_x, edge_y = [], []
+    for u, v in G.edges() if edges is None else edges:
+        x0, y0 = pos[u]
+        x1, y1 = pos[v]
+        edge_x += [x0, x1, None]
+        edge_y += [y0, y1, None]
+    return edge_x, edge_y
+
+
+def edge_segments(G, pos, edges=None):
+    # Same segments as float32 arrays with NaN breaks: sent as binary, and
+    # built without a Python loop over the edges of a CoherenceGraph
+    if isinstance(G, CoherenceGraph) and edges is None:
+        xy = np.array([pos[node] for node in G.labels], dtype=np.float32).reshape(-1, 2)
+        src, dst = G.sources(), G.indices
+    else:
+        nodes = list(G.nodes())
+        index = {node: i for i, node in enumerate(nodes)}
+        xy = np.array([pos[node] for node in nodes], dtype=np.float32).reshape(-1, 2)
+        pairs = np.array([(index[u], index[v]) for u, v in (G.edges() if edges is None else edges)],
+                         dtype=np.int64).reshape(-1, 2)
+        src, dst = pairs[:, 0], pairs[:, 1]
+    segments = np.full((len(src), 3, 2), np.nan, dtype=np.float32)
+    segments[:, 0], segments[:, 1] = xy[src], xy[dst]
+    return segments[:, :, 0].ravel(), segments[:, :, 1].ravel()
+
+
+def node_coordinates(G, pos):
+    nodes = list(G.nodes())
+    return [pos[n][0] for n in nodes], [pos[n][1] for n in nodes], nodes
@@ -0,0 +1,107 @@
+import networkx as nx
+import numpy as np
+
+from .csr import CoherenceGraph
+from .graphs import layout
+from .perf import span
+
+# Spring iterations after an edit. The step of each shrinks with the
+# iteration count, so a few keep the touched nodes near where they were
+# while they settle between the pinned ones around them.
+WARM_ITERATIONS = 5
+# Spread of a new node around its neighbours' centre
+JITTER = 0.05
+
+
+# --- Live coherence graph ---
+# One graph and its positions kept across reruns (a Streamlit session's
+# panel, say). Edits come in as diffs; only the nodes they touch are laid out
+# again, for a few spring iterations started where they were, with their
+# untouched neighbours pinned. Every other node keeps its position, so
+# nothing jumps, and an edit costs time in the size of its neighbourhood,
+# not of the graph. The first layout comes from the shared layout cache. A
+# CoherenceGraph is converted to networkx, which the edits work on.
+class LiveGraph:
+    def __init__(self, G, seed=42):
+        self.seed = seed
+        self._reset(G)
+
+    def _reset(self, G):
+        self.graph = G.to_networkx() if isinstance(G, CoherenceGraph) else G.copy()
+        self.pos = layout(G, self.seed)
+        self._rng = np.random.default_rng(self.seed)
+
+    def __len__(self):
+        return len(self.graph)
+
+    def apply(self, add_nodes=(), remove_nodes=(), add_edges=(), remove_edges=()):
+        # Edges are (u, v) or (u, v, data); adding an existing edge updates
+        # its data, which moves nothing. Returns the nodes laid out again.
+        G = self.graph
+        touched = set()
+        for u, v in remove_edges:
+            if G.has_edge(u, v):
+                G.remove_edge(u, v)
+                touched.update((u, v))
+        for node in remove_nodes:
+            if node in G:
+                touched.update(nx.all_neighbors(G, node))
+                touched.discard(node)
+                G.remove_node(node)
+                self.pos.pop(node, None)
+        for node in add_nodes:
+            if node not in G:
+                G.add_node(node)
+                touched.add(node)
+        for u, v, *data in add_edges:
+            if not G.has_edge(u, v):
+                touched.update((u, v))
+            G.add_edge(u, v, **(data[0] if data else {}))
+
+        touched = {node for node in touched if node in G}
+        self._relax(touched)
+        return touched
+
+    def sync(self, target):
+        # Applies the difference with a freshly built graph. Diffing walks
+        # both graphs: meant for the small builder graphs of the apps; large
+        # graphs should pass their edits to apply() directly.
+        G = self.graph
+        if isinstance(target, CoherenceGraph):
+            target = target.to_networkx()
+        if target.is_directed() != G.is_directed():
+            self._reset(target)
+            return set(target)
+        return self.apply(
+            add_nodes=[node for node in target if node not in G],
+            remove_nodes=[node for node in G if node not in target],
+            add_edges=[(u, v, d) for u, v, d in target.edges(data=True)
+                       if not G.has_edge(u, v) or G.edges[u, v] != d],
+            remove_edges=[(u, v) for u, v in G.edges() if not target.has_edge(u, v)],
+        )
+
+    def _place(self, node):
+        # A new node starts next to the centre of its placed neighbours
+        around = [self.pos[n] for n in nx.all_neighbors(self.graph, node) if n in self.pos]
+        centre = np.mean(around, axis=0) if around else np.zeros(2)
+        return centre + self._rng.normal(0, JITTER, 2)
+
+    def _relax(self, touched):
+        if not touched:
+            return
+        G = self.graph
+        for node in sorted(touched - set(self.pos), key=str):
+            self.pos[node] = self._place(node)
+        # Nodes left without edges have nothing to settle against: they stay
+        touched = {node for node in touched if G.degree(node)}
+        if not touched:
+            return
+        pinned = {n for node in touched for n in nx.all_neighbors(G, node)} - touched
+        H = G.subgraph(touched | pinned)
+        with span("layout"):
+            # scale=None keeps the subgraph in the frame of the whole layout
+            # instead of rescaling it to [-1, 1]
+            pos = nx.spring_layout(H, pos={node: self.pos[node] for node in H},
+                                   fixed=sorted(pinned, key=str) or None, k=1 / np.sqrt(len(G)),
+                                   iterations=WARM_ITERATIONS, scale=None, seed=self.seed)
+        self.pos.update((node, pos[node]) for node in touched)
@@ -0,0 +1,37 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .counters import CounterRNG
+from .simulators import CHUNK, prepare, simulate_range
+
+
+# --- Sharded runs ---
+# Each shard regenerates a contiguous run of chunks from the counter-based
+# stream of the seed (see counters), so shards need nothing from each other
+# and the summed counts are bit-identical to simulate() with the same seed
+# and chunk, whatever the number of shards or worker processes. Shards
+# beyond the number of chunks stay idle.
+def split(n, shards):
+    base, extra = divmod(n, shards)
+    return [base + (i < extra) for i in range(shards)]
+
+
+def _run_shard(name, start, stop, n, seed, chunk, params):
+    return simulate_range(name, start, stop, n, CounterRNG(seed), chunk, **params)[0]
+
+
+def simulate_sharded(name, n, seed=None, shards=None, workers=None, chunk=CHUNK, **params):
+    shards = shards or os.cpu_count() or 1
+    rng = CounterRNG(seed)
+    edges, _ = prepare(name, rng.setup(), **params)
+
+    bounds = np.cumsum([0] + split(-(-n // chunk), shards)) * chunk
+    counts = np.zeros(len(edges) - 1)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        jobs = [pool.submit(_run_shard, name, start, stop, n, rng.seed, chunk, params)
+                for start, stop in zip(bounds[:-1], bounds[1:]) if start < min(stop, n)]
+        for job in jobs:
+            counts += job.result()
+    return counts, edges
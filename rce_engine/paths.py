@@ -0,0 +1,206 @@
+import collections
+import heapq
+
+import numpy as np
+
+from .csr import CoherenceGraph
+
+# A frontier with fewer out-arcs than NARROW_ARCS for NARROW_LEVELS levels in a
+# row is left to plain Python: on deep, thin graphs (long chains) the fixed
+# cost of a dozen numpy calls per level would dominate
+NARROW_ARCS = 256
+NARROW_LEVELS = 16
+
+
+# --- Edge arrays ---
+# Nodes become indices into labels; every edge becomes an arc src -> dst (both
+# directions for undirected graphs), arc_edge mapping each arc back to its
+# position in G.edges(). A CoherenceGraph hands over its arrays directly.
+def edge_arrays(G, weight="mu"):
+    if isinstance(G, CoherenceGraph):
+        labels, src, dst, mu = G.labels, G.sources(), G.indices, G.mu.astype(float)
+    else:
+        labels = list(G.nodes())
+        index = {node: i for i, node in enumerate(labels)}
+        edges = list(G.edges(data=weight, default=1.0))
+        src = np.array([index[u] for u, _, _ in edges], dtype=np.int64)
+        dst = np.array([index[v] for _, v, _ in edges], dtype=np.int64)
+        mu = np.array([m for _, _, m in edges], dtype=float)
+    arc_edge = np.arange(len(src))
+    if not G.is_directed():
+        src, dst = np.concatenate([src, dst]), np.concatenate([dst, src])
+        arc_edge = np.concatenate([arc_edge, arc_edge])
+    return labels, src, dst, mu, arc_edge
+
+
+def _csr(src, n_nodes):
+    order = np.argsort(src, kind="stable")
+    indptr = np.zeros(n_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=n_nodes), out=indptr[1:])
+    return order, indptr
+
+
+def _weights(mu):
+    with np.errstate(divide="ignore"):
+        return -np.log(mu)
+
+
+def _finish_topological(frontier, indeg, order, indptr, dst, dist, pred, w):
+    # The rest of the DAG in one pass in topological order, row by row, in
+    # plain Python. Returns the number of nodes it finished.
+    order, indptr, dst, indeg = order.tolist(), indptr.tolist(), dst.tolist(), indeg.tolist()
+    queue, topo = collections.deque(frontier.tolist()), []
+    while queue:
+        u = queue.popleft()
+        topo.append(u)
+        for arc in order[indptr[u]:indptr[u + 1]]:
+            v = dst[arc]
+            indeg[v] -= 1
+            if indeg[v] == 0:
+                queue.append(v)
+    for row, weights in enumerate(w.tolist()):
+        best, back = dist[row].tolist(), pred[row].tolist()
+        for u in topo:
+            du = best[u]
+            for arc in order[indptr[u]:indptr[u + 1]]:
+                v, nd = dst[arc], du + weights[arc]
+                if nd < best[v]:
+                    best[v], back[v] = nd, u
+        dist[row], pred[row] = best, back
+    return len(topo)
+
+
+# --- DAG solver ---
+# Kahn's algorithm, one frontier of in-degree-zero nodes at a time: when a
+# node enters the frontier all its in-arcs have been relaxed, so its best
+# score is final. Every arc is relaxed exactly once, for all k rows of w at
+# once. Once the frontier stays narrow the rest is one topological pass in
+# Python instead. Returns None if the graph has a cycle.
+def _solve_dag(n_nodes, src, dst, w, source):
+    k = w.shape[0]
+    order, indptr = _csr(src, n_nodes)
+    dist = np.full((k, n_nodes), np.inf)
+    dist[:, source] = 0.0
+    pred = np.full((k, n_nodes), -1, dtype=np.int64)
+
+    indeg = np.bincount(dst, minlength=n_nodes)
+    frontier = np.flatnonzero(indeg == 0)
+    finished = 0
+    narrow = 0
+    while frontier.size:
+        starts, counts = indptr[frontier], indptr[frontier + 1] - indptr[frontier]
+        narrow = narrow + 1 if counts.sum() < NARROW_ARCS else 0
+        if narrow >= NARROW_LEVELS:
+            finished += _finish_topological(frontier, indeg, order, indptr, dst, dist, pred, w)
+            break
+        finished += frontier.size
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        arcs = order[np.repeat(starts, counts) + offsets]
+        if not arcs.size:
+            break
+
+        arcs = arcs[np.argsort(dst[arcs], kind="stable")]
+        heads = dst[arcs]
+        cand = dist[:, src[arcs]] + w[:, arcs]
+        first = np.flatnonzero(np.r_[True, heads[1:] != heads[:-1]])
+        targets = heads[first]
+        best = np.minimum(np.minimum.reduceat(cand, first, axis=1), dist[:, targets])
+        dist[:, targets] = best
+
+        # Any arc reaching its head's best score is a valid argmax
+        rows, cols = np.nonzero(cand == np.repeat(best, np.diff(np.r_[first, arcs.size]), axis=1))
+        pred[rows, heads[cols]] = src[arcs[cols]]
+
+        indeg[targets] -= np.diff(np.r_[first, arcs.size])
+        frontier = targets[indeg[targets] == 0]
+
+    if finished < n_nodes:
+        return None
+    return dist, pred
+
+
+# --- General solver (graphs with cycles) ---
+def _solve_dijkstra(n_nodes, src, dst, w, source):
+    if (w < 0).any():
+        raise ValueError("Coherence weights must lie in [0, 1] on graphs with cycles")
+    order, indptr = _csr(src, n_nodes)
+    order, indptr, dst = order.tolist(), indptr.tolist(), dst.tolist()
+    dist = np.full((w.shape[0], n_nodes), np.inf)
+    pred = np.full((w.shape[0], n_nodes), -1, dtype=np.int64)
+    for row, weights in enumerate(w.tolist()):
+        best, back = [np.inf] * n_nodes, [-1] * n_nodes
+        best[source] = 0.0
+        heap = [(0.0, source)]
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > best[u]:
+                continue
+            for arc in order[indptr[u]:indptr[u + 1]]:
+                v, nd = dst[arc], d + weights[arc]
+                if nd < best[v]:
+                    best[v], back[v] = nd, u
+                    heapq.heappush(heap, (nd, v))
+        dist[row], pred[row] = best, back
+    return dist, pred
+
+
+def best_paths(G, source, mu=None, weight="mu"):
+    # mu: optional (k, E) batch of coherence assignments in G.edges() order.
+    # Returns labels, best μ products (k, V) and predecessor indices (k, V).
+    labels, src, dst, edge_mu, arc_edge = edge_arrays(G, weight)
+    mu = np.atleast_2d(edge_mu if mu is None else mu)
+    w = _weights(mu[:, arc_edge])
+    start = G.index(source) if isinstance(G, CoherenceGraph) else labels.index(source)
+    solved = _solve_dag(len(labels), src, dst, w, start)
+    if solved is None:
+        solved = _solve_dijkstra(len(labels), src, dst, w, start)
+    dist, pred = solved
+    return labels, np.exp(-dist), pred
+
+
+def _walk(labels, pred, target):
+    path = [target]
+    while pred[path[-1]] >= 0:
+        path.append(pred[path[-1]])
+    return [labels[i] for i in reversed(path)]
+
+
+def _targets(targets):
+    # A lone label (a string, a number) or any other iterable of labels:
+    # lists, tuples, sets, numpy arrays
+    if isinstance(targets, (str, bytes)) or not np.iterable(targets):
+        return [targets]
+    return [t.item() if isinstance(t, np.generic) else t for t in targets]
+
+
+# --- Actualization path A = argmax_P ∏ μ(e) ---
+def actualization_paths(G, pairs, mu=None, weight="mu"):
+    # For every μ assignment and every (source, targets) pair: the most
+    # coherent path and its μ product ([], 0.0 when no target is reachable).
+    # Pairs sharing a source are solved together.
+    rows = 1 if mu is None else np.atleast_2d(mu).shape[0]
+    results = [[None] * len(pairs) for _ in range(rows)]
+    by_source = {}
+    for i, (source, targets) in enumerate(pairs):
+        by_source.setdefault(source, []).append(i)
+
+    for source, indices in by_source.items():
+        labels, score, pred = best_paths(G, source, mu, weight)
+        index = {node: i for i, node in enumerate(labels)}
+        for i in indices:
+            ids = np.array([index[t] for t in _targets(pairs[i][1])])
+            for row in range(rows):
+                best = ids[np.argmax(score[row, ids])]
+                if score[row, best] > 0:
+                    results[row][i] = (_walk(labels, pred[row], best), float(score[row, best]))
+                else:
+                    results[row][i] = ([], 0.0)
+    return results
+
+
+def actualization_path(G, source, targets, weight="mu"):
+    return actualization_paths(G, [(source, targets)], weight=weight)[0][0]
+
+
+def path_edges(path):
+    return list(zip(path[:-1], path[1:]))
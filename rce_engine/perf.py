@@ -0,0 +1,204 @@
+import collections
+import contextlib
+import contextvars
+import json
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+
+# Hot-path stages, in pipeline order
+STAGES = ("simulate", "histogram", "graph", "layout", "figure", "serialize")
+
+# Reruns kept for the rolling percentiles, spans kept for export
+HISTORY_RUNS = 200
+LOG_SPANS = 20000
+
+_current = contextvars.ContextVar("rce_perf_recorder", default=None)
+
+
+# --- Shared tracemalloc ---
+# tracemalloc is process-wide: every Streamlit session shares it. Recorders
+# that track memory hold a count of users; tracing starts with the first and
+# stops with the last, and only when it was not already on. The peak is reset
+# only while no span of another recorder is open, as that would cut its
+# measure short.
+_trace_lock = threading.Lock()
+_trace_users = 0
+_trace_owned = False
+_open_spans = 0
+
+
+def _trace_acquire():
+    global _trace_users, _trace_owned
+    with _trace_lock:
+        if _trace_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _trace_owned = True
+        _trace_users += 1
+
+
+def _trace_release():
+    global _trace_users, _trace_owned
+    with _trace_lock:
+        _trace_users -= 1
+        if _trace_users == 0 and _trace_owned:
+            tracemalloc.stop()
+            _trace_owned = False
+
+
+# --- Span recorder ---
+# Spans are exclusive: a nested span's time (say a layout inside a figure) is
+# taken off its parent, so the per-stage totals of a run add up to the time
+# spent inside spans. Memory is the tracemalloc peak above the span's start,
+# only measured when memory=True, and left out of spans that could not reset
+# the shared peak (another session was measuring). It counts every session's
+# allocations made meanwhile.
+class Recorder:
+    def __init__(self, memory=False, history=HISTORY_RUNS):
+        self.memory = memory
+        self.run_id = 0
+        self.spans = []
+        self.runs = collections.deque(maxlen=history)
+        self.log = collections.deque(maxlen=LOG_SPANS)
+        self._stack = []
+        self._started = time.perf_counter()
+        self._tracing = False
+        self._measuring = 0
+        self.running = False
+
+    def start_run(self):
+        self.run_id += 1
+        self.running = True
+        self.spans = []
+        self._stack = []
+        self._started = time.perf_counter()
+        if self.memory and not self._tracing:
+            # Tracing slows every allocation: only on for the runs that ask
+            _trace_acquire()
+            self._tracing = True
+
+    def end_run(self):
+        totals = self.totals()
+        totals["total"] = time.perf_counter() - self._started
+        self.runs.append(totals)
+        self.running = False
+        if self._tracing:
+            _trace_release()
+            self._tracing = False
+        return totals
+
+    @contextlib.contextmanager
+    def span(self, stage):
+        global _open_spans
+        memory = measured = self._tracing
+        if memory:
+            with _trace_lock:
+                # This recorder's open spans fold the peak in first; others'
+                # would lose it
+                measured = _open_spans == self._measuring
+                if measured:
+                    if self._stack:
+                        self._stack[-1]["peak"] = max(self._stack[-1]["peak"], tracemalloc.get_traced_memory()[1])
+                    tracemalloc.reset_peak()
+                base = tracemalloc.get_traced_memory()[0]
+                _open_spans += 1
+                self._measuring += 1
+        frame = {"children": 0.0, "peak": 0}
+        self._stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            self._stack.pop()
+            if self._stack:
+                self._stack[-1]["children"] += seconds
+            entry = {"run": self.run_id, "stage": stage, "seconds": seconds - frame["children"],
+                     "wall": seconds, "time": time.time()}
+            if memory:
+                with _trace_lock:
+                    _open_spans -= 1
+                    self._measuring -= 1
+                    if measured:
+                        entry["peak_bytes"] = max(frame["peak"], tracemalloc.get_traced_memory()[1]) - base
+            self.spans.append(entry)
+            self.log.append(entry)
+
+    def add(self, stage, seconds):
+        # A span timed elsewhere (a worker thread, see worker.Job): it ran
+        # beside this run's spans, not inside them, so it is taken off none
+        entry = {"run": self.run_id, "stage": stage, "seconds": seconds, "wall": seconds, "time": time.time()}
+        self.spans.append(entry)
+        self.log.append(entry)
+
+    def totals(self):
+        totals = {}
+        for entry in self.spans:
+            totals[entry["stage"]] = totals.get(entry["stage"], 0.0) + entry["seconds"]
+        return totals
+
+    def summary(self):
+        # One row per stage: this run's time, rolling p50 / p95 over the kept
+        # reruns (ms), and this run's largest memory peak when tracked
+        last = self.runs[-1] if self.runs else self.totals()
+        stages = [s for s in STAGES if any(s in run for run in self.runs)]
+        stages += sorted({s for run in self.runs for s in run} - set(stages) - {"total"}) + ["total"]
+        peaks = {}
+        for entry in self.spans:
+            if "peak_bytes" in entry:
+                peaks[entry["stage"]] = max(peaks.get(entry["stage"], 0), entry["peak_bytes"])
+
+        rows = []
+        for stage in stages:
+            values = [run[stage] for run in self.runs if stage in run]
+            if not values:
+                continue
+            p50, p95 = (np.percentile(values, [50, 95]) * 1e3).tolist()
+            row = {"stage": stage, "last ms": last.get(stage, 0.0) * 1e3, "p50 ms": p50, "p95 ms": p95,
+                   "runs": len(values)}
+            if stage in peaks:
+                row["peak MiB"] = peaks[stage] / 2 ** 20
+            rows.append(row)
+        return rows
+
+    def to_jsonl(self):
+        return "".join(json.dumps(entry) + "\n" for entry in self.log)
+
+
+# --- Active recorder ---
+# Held in a context variable, so every Streamlit session thread records into
+# its own recorder; without one, span() costs a single lookup.
+def activate(recorder):
+    return _current.set(recorder)
+
+
+def deactivate(token):
+    _current.reset(token)
+
+
+@contextlib.contextmanager
+def recording(recorder=None):
+    recorder = Recorder() if recorder is None else recorder
+    token = activate(recorder)
+    recorder.start_run()
+    try:
+        yield recorder
+    finally:
+        recorder.end_run()
+        deactivate(token)
+
+
+_IDLE = contextlib.nullcontext()
+
+
+def span(stage):
+    recorder = _current.get()
+    return _IDLE if recorder is None else recorder.span(stage)
+
+
+def record(stage, seconds):
+    recorder = _current.get()
+    if recorder is not None:
+        recorder.add(stage, seconds)
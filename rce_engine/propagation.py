@@ -0,0 +1,257 @@
+import collections
+import warnings
+
+import numpy as np
+
+from .csr import CoherenceGraph
+from .paths import NARROW_ARCS, NARROW_LEVELS, _csr, edge_arrays
+
+# Mass still in transit below which a propagation has converged
+TOLERANCE = 1e-12
+MAX_STEPS = 100_000
+
+
+# --- Contexts as μ assignments ---
+# A context (slit or detector configuration) is the set of nodes it removes:
+# every edge touching one of them loses its coherence. Returns (k, E) μ rows in
+# G.edges() order, one per context, ready for actualization_probabilities.
+def context_mu(G, contexts, weight="mu"):
+    labels, src, dst, mu, _ = edge_arrays(G, weight)
+    index = {node: i for i, node in enumerate(labels)}
+    rows = np.repeat(mu[None, :], len(contexts), axis=0)
+    for row, removed in zip(rows, contexts):
+        removed = np.array([index[node] for node in removed], dtype=np.int64)
+        row[np.isin(src, removed) | np.isin(dst, removed)] = 0.0
+    return rows
+
+
+def _transitions(n_nodes, src, mu):
+    # Arcs sorted by tail, each carrying μ over the μ sum of its tail's
+    # out-arcs in every context: a row-stochastic operator, with the nodes
+    # whose out-arcs all have μ = 0 as its absorbing states
+    order, indptr = _csr(src, n_nodes)
+    weights = mu[:, order].T
+    tails = src[order]
+    # Summed per tail, not as differences of a running total: those leave
+    # rounding residue where every μ is 0, and the operator must stay exact
+    out = np.stack([np.bincount(tails, column, minlength=n_nodes) for column in mu[:, order]], axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = np.where(out[tails] > 0, weights / out[tails], 0.0)
+    return order, indptr, p, out <= 0
+
+
+def _finish_dag(frontier, indeg, indptr, heads, p, absorbing, transit, absorbed):
+    # The rest of a DAG in one pass in topological order, in plain Python.
+    # Returns the number of nodes it finished.
+    indptr, heads, indeg = indptr.tolist(), heads.tolist(), indeg.tolist()
+    queue, topo = collections.deque(frontier.tolist()), []
+    while queue:
+        u = queue.popleft()
+        topo.append(u)
+        for v in heads[indptr[u]:indptr[u + 1]]:
+            indeg[v] -= 1
+            if indeg[v] == 0:
+                queue.append(v)
+    mass, stops = transit.tolist(), absorbing.tolist()
+    for u in topo:
+        m = mass[u]
+        absorbed[u] = [mj if stop else 0.0 for mj, stop in zip(m, stops[u])]
+        for arc in range(indptr[u], indptr[u + 1]):
+            out = mass[heads[arc]]
+            for j, pj in enumerate(p[arc].tolist()):
+                out[j] += pj * m[j]
+    return len(topo)
+
+
+# --- DAG pass ---
+# Kahn's algorithm, one frontier of in-degree-zero nodes at a time: a node
+# enters the frontier once all the activation reaching it has arrived, which
+# it then absorbs or passes on along its out-arcs. Exact, and every arc is
+# used once, for all contexts at once. Once the frontier stays narrow the
+# rest is one topological pass in Python. Returns None on graphs with cycles.
+def _propagate_dag(n_nodes, indptr, heads, p, absorbing, start):
+    transit = np.zeros((n_nodes, p.shape[1]))
+    absorbed = np.zeros_like(transit)
+    transit[start] = 1.0
+    indeg = np.bincount(heads, minlength=n_nodes)
+    frontier = np.flatnonzero(indeg == 0)
+    finished = narrow = 0
+    while frontier.size:
+        starts, counts = indptr[frontier], indptr[frontier + 1] - indptr[frontier]
+        narrow = narrow + 1 if counts.sum() < NARROW_ARCS else 0
+        if narrow >= NARROW_LEVELS:
+            finished += _finish_dag(frontier, indeg, indptr, heads, p, absorbing, transit, absorbed)
+            break
+        finished += frontier.size
+        absorbed[frontier] = np.where(absorbing[frontier], transit[frontier], 0.0)
+        arcs = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        if not arcs.size:
+            break
+        flow = p[arcs] * transit[np.repeat(frontier, counts)]
+        by_head = np.argsort(heads[arcs], kind="stable")
+        targets, first = np.unique(heads[arcs][by_head], return_index=True)
+        transit[targets] += np.add.reduceat(flow[by_head], first, axis=0)
+        indeg[targets] -= np.diff(np.r_[first, arcs.size])
+        frontier = targets[indeg[targets] == 0]
+    return absorbed if finished == n_nodes else None
+
+
+def _narrow_steps(frontier, transit, absorbed, indptr, heads, p, absorbing, tol, steps):
+    # Steps over a narrow frontier in plain Python (see paths.NARROW_ARCS),
+    # until it widens again, activation settles or the steps run out. The
+    # frontier's mass goes back into transit; returns the frontier and the
+    # steps taken.
+    k = transit.shape[1]
+    mass = {u: transit[u].tolist() for u in frontier.tolist()}
+    transit[frontier] = 0.0
+    taken = 0
+    while taken < steps:
+        arcs = sum(int(indptr[u + 1] - indptr[u]) for u in mass)
+        if arcs >= NARROW_ARCS:
+            break
+        moving = [0.0] * k
+        for u, m in mass.items():
+            for j, stop in enumerate(absorbing[u].tolist()):
+                if stop:
+                    absorbed[u, j] += m[j]
+                    m[j] = 0.0
+                moving[j] += m[j]
+        if max(moving, default=0.0) <= tol:
+            break
+        moved = {}
+        for u, m in mass.items():
+            for arc in range(indptr[u], indptr[u + 1]):
+                out = moved.setdefault(int(heads[arc]), [0.0] * k)
+                for j, pj in enumerate(p[arc].tolist()):
+                    out[j] += pj * m[j]
+        mass = moved
+        taken += 1
+    for u, m in mass.items():
+        transit[u] = m
+    return np.array(sorted(mass), dtype=np.int64), taken
+
+
+def _finish_live(pairs, live, rindptr, rarcs, tails, coherent):
+    # The rest of the reverse search, one (node, context) pair at a time
+    rindptr, rarcs, tails = rindptr.tolist(), rarcs.tolist(), tails.tolist()
+    queue = collections.deque(pairs)
+    while queue:
+        v, j = queue.popleft()
+        for arc in rarcs[rindptr[v]:rindptr[v + 1]]:
+            u = tails[arc]
+            if coherent[arc, j] and not live[u, j]:
+                live[u, j] = True
+                queue.append((u, j))
+
+
+# --- Live nodes ---
+# Nodes from which some absorbing node is reachable over coherent arcs, per
+# context: a breadth-first search from the absorbing nodes along reversed
+# arcs, for all contexts at once. Activation reaching any other node is
+# trapped in a loop it never leaves (a closed class without absorbing nodes).
+def _live_nodes(n_nodes, tails, heads, p, absorbing):
+    rarcs, rindptr = _csr(heads, n_nodes)
+    coherent = p > 0
+    live = absorbing.copy()
+    frontier = np.flatnonzero(live.any(axis=1))
+    new = live[frontier]
+    narrow = 0
+    while frontier.size:
+        starts, counts = rindptr[frontier], rindptr[frontier + 1] - rindptr[frontier]
+        narrow = narrow + 1 if counts.sum() < NARROW_ARCS else 0
+        if narrow >= NARROW_LEVELS:
+            nodes, contexts = np.nonzero(new)
+            _finish_live(zip(frontier[nodes].tolist(), contexts.tolist()), live, rindptr, rarcs, tails,
+                         coherent)
+            break
+        arcs = rarcs[np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())]
+        if not arcs.size:
+            break
+        reach = coherent[arcs] & np.repeat(new, counts, axis=0)
+        by_tail = np.argsort(tails[arcs], kind="stable")
+        targets, first = np.unique(tails[arcs][by_tail], return_index=True)
+        new = np.logical_or.reduceat(reach[by_tail], first, axis=0) & ~live[targets]
+        live[targets] |= new
+        keep = new.any(axis=1)
+        frontier, new = targets[keep], new[keep]
+    return live
+
+
+# --- μ propagation ---
+# Activation starts as 1 on the source and walks the arcs with the
+# probabilities of the μ operator; it is absorbed by the nodes without
+# coherent out-arcs (hits, dead ends). A DAG takes one exact pass (above).
+# On graphs with cycles each step is a sparse product over the out-arcs of
+# the nodes reached by the previous one only, for all k contexts at once (one
+# column each), a frontier that stays narrow stepping in plain Python.
+# Activation entering a node that is not live (above) is trapped: it is taken
+# out as it arrives, so the mass in transit decays geometrically until it
+# falls under tol. Every live node reaches absorption in fewer than V steps,
+# so V steps without any decay mean rounding has stalled it: the loop stops
+# there, or after max_steps. Returns labels and (k, V) probabilities of every
+# node actualizing the particle; rows sum to 1 less the trapped mass and what
+# is still in transit, both reported by a RuntimeWarning when over tol.
+def actualization_probabilities(G, source, mu=None, weight="mu", tol=TOLERANCE, max_steps=MAX_STEPS):
+    if not G.is_directed():
+        raise ValueError("μ propagation needs a directed coherence graph")
+    labels, src, dst, edge_mu, _ = edge_arrays(G, weight)
+    mu = np.atleast_2d(edge_mu if mu is None else mu)
+    if (mu < 0).any():
+        raise ValueError("Coherence weights must be non-negative")
+    n_nodes = len(labels)
+    order, indptr, p, absorbing = _transitions(n_nodes, src, mu)
+    heads = dst[order]
+
+    start = G.index(source) if isinstance(G, CoherenceGraph) else labels.index(source)
+    absorbed = _propagate_dag(n_nodes, indptr, heads, p, absorbing, start)
+    if absorbed is not None:
+        return labels, absorbed.T
+
+    live = _live_nodes(n_nodes, src[order], heads, p, absorbing)
+    # Trapped activation is absorbed where it enters, then taken out below
+    stops = absorbing | ~live
+    transit = np.zeros((n_nodes, mu.shape[0]))
+    absorbed = np.zeros_like(transit)
+    frontier = np.array([start])
+    transit[start] = 1.0
+
+    step = narrow = stalled = 0
+    least = np.inf
+    while True:
+        # Activation reaching an absorbing node stays there
+        stopped = stops[frontier]
+        absorbed[frontier] += np.where(stopped, transit[frontier], 0.0)
+        transit[frontier] = np.where(stopped, 0.0, transit[frontier])
+        moving = transit[frontier].sum(axis=0)
+        if moving.sum() < least:
+            least, stalled = moving.sum(), step
+        if step >= max_steps or step - stalled >= n_nodes or moving.max(initial=0.0) <= tol:
+            break
+
+        # Out-arcs of the frontier, then their flow summed per head
+        starts, counts = indptr[frontier], indptr[frontier + 1] - indptr[frontier]
+        narrow = narrow + 1 if counts.sum() < NARROW_ARCS else 0
+        if narrow >= NARROW_LEVELS:
+            frontier, taken = _narrow_steps(frontier, transit, absorbed, indptr, heads, p, stops, tol,
+                                            min(max_steps - step, n_nodes))
+            step += taken
+            narrow = 0
+            continue
+        arcs = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        flow = p[arcs] * transit[np.repeat(frontier, counts)]
+        by_head = np.argsort(heads[arcs], kind="stable")
+        targets, first = np.unique(heads[arcs][by_head], return_index=True)
+        transit[frontier] = 0.0
+        transit[targets] += np.add.reduceat(flow[by_head], first, axis=0)
+        frontier = targets
+        step += 1
+
+    trapped = np.where(live, 0.0, absorbed).sum(axis=0)
+    absorbed[~live] = 0.0
+    if trapped.max() > tol:
+        warnings.warn(f"μ propagation: up to {trapped.max():.3g} of the activation is trapped in loops "
+                      "without absorbing nodes", RuntimeWarning, stacklevel=2)
+    if moving.max(initial=0.0) > tol:
+        warnings.warn(f"μ propagation: up to {moving.max():.3g} of the activation is still in transit "
+                      f"after {step} steps", RuntimeWarning, stacklevel=2)
+    return labels, absorbed.T
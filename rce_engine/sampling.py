@@ -0,0 +1,164 @@
+import functools
+
+import numpy as np
+
+from .perf import span
+
+# Interpretation models understood by simulate_hits
+MODELS = ("classical", "rce", "many_worlds", "qbism")
+
+# Resolution of the phase grid behind the double-slit CDF tables
+PHASE_BINS = 256
+
+# Engines understood by sample_screen
+SCREEN_ENGINES = ("multinomial", "exact")
+
+
+def _rng(rng):
+    return np.random.default_rng() if rng is None else rng
+
+
+# --- Batch particle engine (v2.3 interpretation models) ---
+# All n particles are drawn as whole arrays; the distribution per model is the
+# same as the historical one-particle-at-a-time loop.
+def simulate_hits(model, n, noise, left_open, right_open, rng=None):
+    rng = _rng(rng)
+
+    if model == "classical":
+        if not (left_open or right_open):
+            return np.empty(0)
+        # Each particle picks a slit at random and is lost if that slit is closed
+        left = rng.random(n) < 0.5
+        left = left[np.where(left, bool(left_open), bool(right_open))]
+        return rng.normal(np.where(left, -0.5, 0.5), 0.3)
+
+    if model == "rce":
+        if left_open and right_open:
+            phase = rng.uniform(0, 2 * np.pi, n)
+            return np.sin(20 * phase) + rng.normal(0, noise, n)
+        if left_open:
+            return rng.normal(-0.5, 0.3, n)
+        if right_open:
+            return rng.normal(0.5, 0.3, n)
+        return np.empty(0)
+
+    if model == "many_worlds":
+        return rng.uniform(-1, 1, n)
+
+    if model == "qbism":
+        bias = rng.beta(2, 5, n)
+        return rng.normal(bias - 0.5, 0.5)
+
+    raise ValueError(f"Unknown interpretation model: {model!r}")
+
+
+# Fixed screen extent of each model out to five standard deviations, so that
+# histograms filled chunk by chunk share the same bins
+def hit_range(model, noise, left_open=True, right_open=True):
+    if model == "many_worlds":
+        return (-1.0, 1.0)
+    if model == "qbism":
+        return (-3.0, 3.0)
+    if model == "rce" and left_open and right_open:
+        span = 1 + 5 * noise
+        return (-span, span)
+    return (-2.0, 2.0)
+
+
+# --- Detector index engine (v2.6 / v2.7) ---
+def simulate_hits_rce(n, noise, left_open, right_open, rng=None):
+    rng = _rng(rng)
+    if not (left_open or right_open):
+        return np.zeros(100)
+
+    coherence = (left_open + right_open) / 2
+    # astype(int) truncates toward zero, exactly like int() on a scalar
+    idx = (50 + 40 * np.sin(rng.uniform(0, 2 * np.pi, n)) * coherence).astype(int)
+    idx += rng.normal(0, noise * 10, n).astype(int)
+    return np.bincount(np.clip(idx, 0, 99), minlength=100).astype(float)
+
+
+# --- Double-slit inverse-CDF sampler (v2.2) ---
+# The fringe pattern of every phase on the grid is tabulated once as a CDF. The
+# rows are stacked so that row k spans (k, k + 1]: a particle with phase row k
+# is then placed by a single searchsorted of k + u over the whole table.
+@functools.lru_cache(maxsize=None)
+def _fringe_table(mode, size, phase_bins):
+    positions = np.linspace(-1, 1, size)
+    phase = np.pi * (np.arange(phase_bins) + 0.5) / phase_bins
+    if mode == "rce":
+        p = np.cos(5 * positions + phase[:, None]) ** 2
+    else:
+        p = np.sin(10 * positions + phase[:, None]) ** 2
+    mass = p.sum(axis=1)
+    cdf = np.cumsum(p, axis=1) / mass[:, None]
+    cdf[:, -1] = 1.0
+    cdf += np.arange(phase_bins)[:, None]
+    return cdf.ravel(), mass
+
+
+def _single_slit_cdf(positions, centre):
+    p = np.exp(-((positions - centre) ** 2) / 0.01)
+    cdf = np.cumsum(p) / p.sum()
+    cdf[-1] = 1.0
+    return cdf
+
+
+def simulate_double_slit(n, noise, left_open=True, right_open=True, mode="classical", size=1000, rng=None):
+    rng = _rng(rng)
+    positions = np.linspace(-1, 1, size)
+    if not (left_open or right_open):
+        return positions, np.zeros(size)
+
+    if left_open and right_open:
+        cdf, mass = _fringe_table(mode, size, PHASE_BINS)
+        row = rng.integers(0, PHASE_BINS, n)
+        index = np.searchsorted(cdf, row + rng.random(n), side="right") - row * size
+        # Per-position noise of mean noise / 2 acts as a flat floor under the
+        # fringes: a particle lands uniformly with the floor's share of the mass.
+        floor = noise * size / 2
+        flat = rng.random(n) * (mass[row] + floor) < floor
+        index[flat] = rng.integers(0, size, np.count_nonzero(flat))
+    else:
+        cdf = _single_slit_cdf(positions, -0.3 if left_open else 0.3)
+        index = np.searchsorted(cdf, rng.random(n), side="right")
+
+    index = np.minimum(index, size - 1)
+    return positions, np.bincount(index, minlength=size).astype(float)
+
+
+# --- Detector histogram from a closed-form screen intensity ---
+# "multinomial" turns the curve into bin probabilities once and draws the whole
+# histogram in one go (cost independent of n); "exact" samples every hit
+# position and also returns them.
+def sample_screen(x, intensity, n, bins=100, range=(-1, 1), engine="multinomial", rng=None):
+    rng = _rng(rng)
+    if engine not in SCREEN_ENGINES:
+        raise ValueError(f"Unknown screen engine: {engine!r}")
+
+    total = intensity.sum()
+    if total <= 0:
+        counts, edges = np.histogram(np.empty(0), bins=bins, range=range)
+        return counts, edges, (np.empty(0) if engine == "exact" else None)
+
+    if engine == "exact":
+        with span("simulate"):
+            hits = rng.choice(x, size=n, p=intensity / total)
+        with span("histogram"):
+            counts, edges = np.histogram(hits, bins=bins, range=range)
+        return counts, edges, hits
+
+    with span("histogram"):
+        probs, edges = np.histogram(x, bins=bins, range=range, weights=intensity)
+    with span("simulate"):
+        counts = rng.multinomial(n, probs / probs.sum())
+    return counts, edges, None
+
+
+# --- Histogramming ---
+def histogram(hits, bins=50, range=None):
+    return np.histogram(hits, bins=bins, range=range)
+
+
+def bin_centres(edges):
+    return (edges[:-1] + edges[1:]) / 2
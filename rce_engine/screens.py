@@ -0,0 +1,51 @@
+import numpy as np
+
+from .sampling import _rng, sample_screen
+
+# Interpretation models of the v2.1 screen
+RELATIONAL_MODELS = ("classical", "rce", "many_worlds", "copenhagen", "qbism")
+
+
+# --- Closed-form screen intensities ---
+def interference_screen(x, left_open, right_open, detector=False):
+    # rce_fentes_pro: sin² fringes, or one lobe per open slit once a detector is on
+    if left_open and right_open and not detector:
+        return np.sin(10 * x) ** 2
+    return (np.exp(-((x - 0.3) ** 2) * 20) * right_open
+            + np.exp(-((x + 0.3) ** 2) * 20) * left_open)
+
+
+def _slit_lobes(x, left_open, right_open):
+    return (left_open * np.exp(-((x + 0.4) ** 2) * 100)
+            + right_open * np.exp(-((x - 0.4) ** 2) * 100))
+
+
+def relational_screen(x, model, left_open, right_open, detector=False):
+    # v2.1: the other interpretations only lose their fringes under a detector
+    if left_open and right_open:
+        if model == "classical" or (model != "rce" and detector):
+            return 0.5 * _slit_lobes(x, True, True)
+        return np.cos(20 * x) ** 2 * np.exp(-x ** 2 * 5)
+    return _slit_lobes(x, left_open, right_open)
+
+
+def coherence_screen(x, model):
+    # v2.4 / v2.5: quantum fringes, or coherence zones where the context aligns
+    if model == "classical":
+        return np.cos(5 * np.pi * x) ** 2
+    return np.exp(-((x - 0.3) ** 2) / 0.02) + np.exp(-((x + 0.3) ** 2) / 0.02)
+
+
+def noisy(intensity, scale, rng=None):
+    rng = _rng(rng)
+    return np.maximum(intensity + rng.normal(0, scale, size=intensity.shape), 0)
+
+
+# --- Detector histogram of the pro screen ---
+def generate_interference(n, noise, left_open, right_open, detector=False, bins=100,
+                          engine="multinomial", rng=None):
+    rng = _rng(rng)
+    x = np.linspace(-1, 1, 500)
+    screen = noisy(interference_screen(x, left_open, right_open, detector), noise, rng)
+    counts, edges, _ = sample_screen(x, screen, n, bins=bins, range=(-1, 1), engine=engine, rng=rng)
+    return counts, edges
@@ -0,0 +1,219 @@
+import inspect
+
+import numpy as np
+
+from .counters import blocks, counter_rng
+from .fraunhofer import far_field_screen, grating_mask
+from .perf import span
+from .sampling import (
+    _rng,
+    hit_range,
+    sample_screen,
+    simulate_double_slit,
+    simulate_hits,
+    simulate_hits_rce,
+)
+from .screens import coherence_screen, interference_screen, noisy, relational_screen
+
+# Particles drawn per step of a streamed run; bounds the memory of any run
+CHUNK = 1 << 16
+
+
+def _grid_edges(x):
+    half = (x[1] - x[0]) / 2
+    return np.append(x - half, x[-1] + half)
+
+
+def _screen(x, intensity, bins, engine):
+    edges = np.histogram_bin_edges(x, bins=bins, range=(-1, 1))
+
+    def draw(n, rng):
+        return sample_screen(x, intensity, n, bins=bins, range=(-1, 1), engine=engine, rng=rng)[0]
+    return edges, draw
+
+
+# --- Every app simulator as (edges, draw) ---
+# Preparing a run fixes its bins and any per-run noise realisation with the
+# setup generator; draw(n, rng) then histograms n more particles on those
+# bins, so chunks (and shards with their own generators) can be summed.
+def _hits(rng, model="rce", noise=0.1, left_open=True, right_open=True, bins=50, range=None):
+    # v2.3
+    if range is None:
+        range = hit_range(model, noise, left_open, right_open)
+    edges = np.histogram_bin_edges([], bins=bins, range=range)
+
+    def draw(n, rng):
+        with span("simulate"):
+            hits = simulate_hits(model, n, noise, left_open, right_open, rng)
+        with span("histogram"):
+            return np.histogram(hits, bins=edges)[0]
+    return edges, draw
+
+
+def _detector(rng, noise=0.1, left_open=True, right_open=True):
+    # v2.6 / v2.7: one bin per detector position
+    def draw(n, rng):
+        with span("simulate"):
+            return simulate_hits_rce(n, noise, left_open, right_open, rng)
+    return np.arange(101.0), draw
+
+
+def _double_slit(rng, noise=0.1, left_open=True, right_open=True, mode="classical"):
+    # v2.2: one bin per screen position
+    def draw(n, rng):
+        with span("simulate"):
+            return simulate_double_slit(n, noise, left_open, right_open, mode, rng=rng)[1]
+    return _grid_edges(np.linspace(-1, 1, 1000)), draw
+
+
+# --- Closed-form screens as (x, intensity, noise scale, bins) ---
+# The noise-free part of each screen simulator, shared with the sweep engine,
+# which adds the noise and draws the detections of many runs at once.
+def _interference_screen(left_open=True, right_open=True, detector=False, bins=100):
+    # rce_fentes_pro
+    x = np.linspace(-1, 1, 500)
+    return x, interference_screen(x, left_open, right_open, detector), 1.0, bins
+
+
+def _relational_screen(model="rce", left_open=True, right_open=True, detector=False):
+    # v2.1
+    x = np.linspace(-1, 1, 500)
+    return x, relational_screen(x, model, left_open, right_open, detector), 0.05, len(x)
+
+
+def _coherence_screen(model="rce"):
+    # v2.4 / v2.5
+    x = np.linspace(-1, 1, 1000)
+    return x, coherence_screen(x, model), 1.0, len(x)
+
+
+def _grating_screen(slits=2, width=0.02, spacing=0.1, wavelength=0.02, bins=500):
+    # N-slit grating, far field from the FFT engine
+    x, y = far_field_screen(*grating_mask(slits, width, spacing), wavelength)
+    return x, y, 1.0, bins
+
+
+def _graph_screen(slits=2, spread=0.2, detectors=500, bins=100):
+    # Grating coherence graph: the hit probabilities propagated from μ
+    from .graphs import grating_graph
+    from .propagation import actualization_probabilities
+    _, p = actualization_probabilities(grating_graph(slits, detectors, spread), "Source")
+    return np.linspace(-1, 1, detectors), p[0, slits + 1:], 1.0, bins
+
+
+SCREENS = {
+    "interference": _interference_screen,
+    "relational": _relational_screen,
+    "coherence": _coherence_screen,
+    "grating": _grating_screen,
+    "graph": _graph_screen,
+}
+
+
+def _closed_form(name, rng, noise, engine, **params):
+    x, y, scale, bins = SCREENS[name](**params)
+    return _screen(x, noisy(y, scale * noise, rng), bins, engine)
+
+
+def _interference(rng, noise=0.1, left_open=True, right_open=True, detector=False, bins=100,
+                  engine="multinomial"):
+    return _closed_form("interference", rng, noise, engine, left_open=left_open, right_open=right_open,
+                        detector=detector, bins=bins)
+
+
+def _relational(rng, model="rce", noise=0.1, left_open=True, right_open=True, detector=False,
+                engine="multinomial"):
+    return _closed_form("relational", rng, noise, engine, model=model, left_open=left_open,
+                        right_open=right_open, detector=detector)
+
+
+def _coherence(rng, model="rce", noise=0.1, engine="multinomial"):
+    return _closed_form("coherence", rng, noise, engine, model=model)
+
+
+def _grating(rng, slits=2, width=0.02, spacing=0.1, wavelength=0.02, noise=0.0, bins=500,
+             engine="multinomial"):
+    return _closed_form("grating", rng, noise, engine, slits=slits, width=width, spacing=spacing,
+                        wavelength=wavelength, bins=bins)
+
+
+def _graph(rng, slits=2, spread=0.2, detectors=500, noise=0.0, bins=100, engine="multinomial"):
+    return _closed_form("graph", rng, noise, engine, slits=slits, spread=spread, detectors=detectors, bins=bins)
+
+
+SIMULATORS = {
+    "hits": _hits,
+    "detector": _detector,
+    "double_slit": _double_slit,
+    "interference": _interference,
+    "relational": _relational,
+    "coherence": _coherence,
+    "grating": _grating,
+    "graph": _graph,
+}
+
+
+def defaults(name):
+    # Keyword parameters of a simulator and their default values
+    if name not in SIMULATORS:
+        raise ValueError(f"Unknown simulator: {name!r}")
+    params = inspect.signature(SIMULATORS[name]).parameters
+    return {key: p.default for key, p in params.items() if key != "rng"}
+
+
+def prepare(name, rng=None, **params):
+    if name not in SIMULATORS:
+        raise ValueError(f"Unknown simulator: {name!r}")
+    return SIMULATORS[name](_rng(rng), **params)
+
+
+def _chunks(n, chunk):
+    done = 0
+    while done < n:
+        step = min(chunk, n - done)
+        done += step
+        yield done, step
+
+
+# --- Progressive runs ---
+# Yields (particles done, running histogram, edges) after every chunk; only
+# one chunk of particles is ever held in memory. rng is a seed, None or a
+# CounterRNG: chunk k then draws from counter block k (see counters). A plain
+# Generator is consumed sequentially instead.
+def stream(name, n, chunk=CHUNK, rng=None, **params):
+    counters = counter_rng(rng)
+    if counters is None:
+        edges, draw = prepare(name, rng, **params)
+        steps = ((done, step, rng) for done, step in _chunks(n, chunk))
+    else:
+        edges, draw = prepare(name, counters.setup(), **params)
+        steps = ((first + step, step, counters.block(k)) for k, first, step in blocks(0, n, n, chunk))
+    counts = np.zeros(len(edges) - 1)
+    for done, step, generator in steps:
+        counts += draw(step, generator)
+        yield done, counts.copy(), edges
+    if n == 0:
+        yield 0, counts, edges
+
+
+def simulate(name, n, rng=None, chunk=CHUNK, **params):
+    for _, counts, edges in stream(name, n, chunk, rng, **params):
+        pass
+    return counts, edges
+
+
+# --- Particle ranges ---
+# The histogram of particles [start, stop) of an n-particle run, regenerated
+# from the chunks covering that range alone. Returns the counts, the edges
+# and the particle range actually covered (chunk-aligned).
+def simulate_range(name, start, stop, n, rng, chunk=CHUNK, **params):
+    counters = counter_rng(rng)
+    if counters is None:
+        raise ValueError("Particle ranges need a seed or a CounterRNG, not a sequential Generator")
+    edges, draw = prepare(name, counters.setup(), **params)
+    counts = np.zeros(len(edges) - 1)
+    covered = []
+    for k, first, step in blocks(start, stop, n, chunk):
+        counts += draw(step, counters.block(k))
+        covered += [first, first + step]
+    return counts, edges, (min(covered), max(covered)) if covered else (start, start)
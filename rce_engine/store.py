@@ -0,0 +1,181 @@
+import hashlib
+import json
+import os
+import pathlib
+import shutil
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+# Bump whenever a simulator's output changes for the same parameters and seed:
+# entries written by another engine version are never read back.
+ENGINE_VERSION = 2
+
+# Default size bound of a store, overridable from the environment
+DEFAULT_MAX_BYTES = int(os.environ.get("RCE_STORE_BYTES", 4 << 30))
+
+# Seconds after which the running totals are checked against the directory
+# again (other processes write to the same store)
+RESCAN_SECONDS = 60
+
+
+def digest(key):
+    # Content address of a cache key: its repr is stable for the str, number,
+    # bool, None and tuple values keys are made of
+    return hashlib.sha256(repr((ENGINE_VERSION, key)).encode()).hexdigest()
+
+
+# --- Disk store ---
+# One directory per entry, <root>/<ab>/<digest>/, holding the arrays as
+# .npy files and a meta.json describing the value's layout. An entry is
+# written in a scratch directory and renamed into place, so readers never
+# see half an entry and concurrent writers of the same key simply race to
+# the same content. Reads memory-map the arrays read-only (zero-copy) and
+# touch the entry; once the store outgrows max_bytes the least recently
+# used entries are removed. The entry count and byte total are kept running,
+# updated by put and evict, and only walked from the directory when they are
+# older than RESCAN_SECONDS, so a write or a stats() call does not grow with
+# the store.
+class DiskStore:
+    def __init__(self, root, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = pathlib.Path(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._count = self._bytes = 0
+        self._scanned = None
+        (self.root / "tmp").mkdir(parents=True, exist_ok=True)
+
+    def _path(self, name):
+        return self.root / name[:2] / name
+
+    def get(self, key):
+        path = self._path(digest(key))
+        try:
+            meta = json.loads((path / "meta.json").read_text())
+            arrays = [np.load(path / f"{i}.npy", mmap_mode="r", allow_pickle=False)
+                      for i in range(meta["arrays"])]
+            os.utime(path)
+        except (FileNotFoundError, NotADirectoryError, ValueError):
+            with self._lock:
+                self.misses += 1
+            raise KeyError(key) from None
+        with self._lock:
+            self.hits += 1
+        if meta["kind"] == "array":
+            return arrays[0]
+        return tuple(arrays) if meta["kind"] == "tuple" else arrays
+
+    def put(self, key, value):
+        # Only arrays and flat tuples/lists of arrays are stored; anything
+        # else is returned untouched
+        if isinstance(value, np.ndarray):
+            kind, arrays = "array", [value]
+        elif isinstance(value, (tuple, list)) and value and all(isinstance(v, np.ndarray) for v in value):
+            kind, arrays = type(value).__name__, list(value)
+        else:
+            return value
+        if any(a.dtype.hasobject for a in arrays):
+            return value
+
+        path = self._path(digest(key))
+        if path.exists():
+            return value
+        scratch = pathlib.Path(tempfile.mkdtemp(dir=self.root / "tmp"))
+        try:
+            for i, a in enumerate(arrays):
+                np.save(scratch / f"{i}.npy", a, allow_pickle=False)
+            (scratch / "meta.json").write_text(json.dumps({"kind": kind, "arrays": len(arrays),
+                                                           "key": repr(key)}))
+            size = sum(f.stat().st_size for f in scratch.iterdir())
+            # Any rescan happens now, before the entry is in place: it is
+            # counted once, below
+            self._totals()
+            path.parent.mkdir(exist_ok=True)
+            os.rename(scratch, path)
+        except OSError:
+            # Another process stored the same key first
+            shutil.rmtree(scratch, ignore_errors=True)
+            return value
+        with self._lock:
+            self._count += 1
+            self._bytes += size
+            total = self._bytes
+        if total > self.max_bytes:
+            self.evict()
+        return value
+
+    def entries(self):
+        # (last use, bytes, path) of every entry, oldest first
+        found = []
+        for path in self.root.glob("??/*"):
+            try:
+                size = sum(f.stat().st_size for f in path.iterdir())
+                found.append((path.stat().st_mtime, size, path))
+            except FileNotFoundError:
+                continue
+        return sorted(found)
+
+    def evict(self):
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        count = len(entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+            count -= 1
+        self._record(count, total)
+        return total
+
+    def _record(self, count, total):
+        with self._lock:
+            self._count, self._bytes = count, total
+            self._scanned = time.monotonic()
+
+    def rescan(self):
+        # Walks the directory for the exact entry count and byte total
+        entries = self.entries()
+        self._record(len(entries), sum(size for _, size, _ in entries))
+
+    def _totals(self):
+        with self._lock:
+            fresh = self._scanned is not None and time.monotonic() - self._scanned < RESCAN_SECONDS
+        if not fresh:
+            self.rescan()
+        with self._lock:
+            return self._count, self._bytes
+
+    def _remove(self, path):
+        # Renamed out of the way first, so no reader opens a half-deleted entry;
+        # arrays already memory-mapped stay valid until they are released
+        doomed = pathlib.Path(tempfile.mkdtemp(dir=self.root / "tmp"))
+        try:
+            os.rename(path, doomed / path.name)
+        except OSError:
+            pass
+        shutil.rmtree(doomed, ignore_errors=True)
+
+    def clear(self):
+        for _, _, path in self.entries():
+            self._remove(path)
+        self._record(0, 0)
+        with self._lock:
+            self.hits = self.misses = 0
+
+    def stats(self):
+        # From the running totals: cheap enough for every rerun of a page
+        count, total = self._totals()
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": count, "bytes": total,
+                    "max_bytes": self.max_bytes, "root": str(self.root)}
+
+
+def open_store(root=None):
+    # The store named by RCE_STORE, or None when persistence is off
+    root = root or os.environ.get("RCE_STORE")
+    return DiskStore(root) if root else None
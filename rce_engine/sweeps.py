@@ -0,0 +1,199 @@
+import json
+import pathlib
+
+import numpy as np
+
+from .perf import span
+from .sampling import _rng, hit_range, simulate_hits
+from .simulators import SCREENS, defaults, simulate
+
+# Intensity samples (rows × screen points) noised and binned per batch
+BATCH_SAMPLES = 1 << 22
+# Particles of a hits sweep drawn and binned per batch: past a few hundred
+# thousand, arrays outgrow the caches and batches get slower, not faster
+HITS_BATCH = 1 << 18
+
+# Summary columns computed for every configuration
+STATISTICS = ("hits", "mean", "std", "peak_bin", "visibility")
+
+
+# --- Parameter grids ---
+# grid maps a simulator parameter (or "n") to a sequence of values, or to a
+# single value held fixed. The cartesian product comes back as columns: one
+# array per parameter, one row per configuration, last parameter fastest.
+def parameter_grid(grid):
+    axes = {key: np.atleast_1d(np.asarray(values)) for key, values in grid.items()}
+    if not axes:
+        return {}
+    index = np.meshgrid(*(np.arange(len(v)) for v in axes.values()), indexing="ij")
+    return {key: values[i.ravel()] for (key, values), i in zip(axes.items(), index)}
+
+
+# --- Summary statistics ---
+def visibility(counts):
+    # Fringe contrast (Imax - Imin) / (Imax + Imin) of each row, with Imin
+    # taken between the outermost bins reaching half the maximum: the dark
+    # screen edges do not count as fringe minima.
+    counts = np.atleast_2d(counts)
+    peak = counts.max(axis=1)
+    lit = counts >= peak[:, None] / 2
+    first = lit.argmax(axis=1)
+    last = counts.shape[1] - 1 - lit[:, ::-1].argmax(axis=1)
+    col = np.arange(counts.shape[1])
+    inside = (col >= first[:, None]) & (col <= last[:, None])
+    low = np.where(inside, counts, np.inf).min(axis=1)
+    total = peak + low
+    return np.divide(peak - low, total, out=np.zeros(len(total)), where=total > 0)
+
+
+def summarize(counts, edges):
+    # Row-wise statistics of (rows × bins) counts on (rows × bins + 1) edges
+    centres = (edges[:, :-1] + edges[:, 1:]) / 2
+    total = counts.sum(axis=1)
+    weights = np.divide(counts, total[:, None], out=np.zeros(counts.shape), where=total[:, None] > 0)
+    mean = (weights * centres).sum(axis=1)
+    std = np.sqrt((weights * (centres - mean[:, None]) ** 2).sum(axis=1))
+    return {"hits": total, "mean": mean, "std": std, "peak_bin": counts.argmax(axis=1),
+            "visibility": visibility(counts)}
+
+
+# --- Batched screens ---
+# Every row of a group shares the noise-free screen; its noise realisation
+# and multinomial draw are made for a whole block of rows in one pass.
+def _screen_rows(name, group, noise, n, rng):
+    x, y, scale, bins = SCREENS[name](**group)
+    edges = np.histogram_bin_edges(x, bins=bins, range=(-1, 1))
+    on_screen = (x >= -1) & (x <= 1)
+    x, y = x[on_screen], y[on_screen]
+    index = np.minimum(np.searchsorted(edges, x, side="right") - 1, bins - 1)
+
+    counts = np.empty((len(n), bins))
+    step = max(1, BATCH_SAMPLES // len(x))
+    for start in range(0, len(n), step):
+        rows = slice(start, start + step)
+        k = len(n[rows])
+        with span("simulate"):
+            intensity = np.maximum(y + rng.normal(0, scale * noise[rows, None], (k, len(x))), 0)
+        with span("histogram"):
+            flat = (np.arange(k)[:, None] * bins + index).ravel()
+            mass = np.bincount(flat, weights=intensity.ravel(), minlength=k * bins).reshape(k, bins)
+        total = mass.sum(axis=1, keepdims=True)
+        probs = np.divide(mass, total, out=np.full(mass.shape, 1 / bins), where=total > 0)
+        with span("simulate"):
+            counts[rows] = rng.multinomial(np.where(total[:, 0] > 0, n[rows], 0), probs)
+    return counts, np.broadcast_to(edges, (len(n), len(edges)))
+
+
+# --- Batched hits ---
+# The rows of a hits group differ in noise and n only: their particles are
+# drawn together, HITS_BATCH at a time, each with its row's noise, and
+# binned on its row's edges. Classical runs through a closed slit lose
+# particles, which can then no longer be told apart by row: they return None
+# and run row by row.
+def _hits_rows(group, noise, n, rng):
+    model, left_open, right_open, bins = group["model"], group["left_open"], group["right_open"], group["bins"]
+    if model == "classical" and not (left_open and right_open):
+        return None
+    ranges = np.array([group["range"] or hit_range(model, v, left_open, right_open) for v in noise.tolist()],
+                      dtype=float).reshape(len(n), 2)
+    edges = np.linspace(ranges[:, 0], ranges[:, 1], bins + 1, axis=1)
+    lo, scale = ranges[:, 0], bins / (ranges[:, 1] - ranges[:, 0])
+
+    ends = np.cumsum(n)
+    total = int(ends[-1]) if len(n) else 0
+    counts = np.zeros((len(n), bins))
+    for start in range(0, total, HITS_BATCH):
+        # Row of every particle of the batch
+        taken = np.diff(np.clip(np.append(0, ends), start, start + HITS_BATCH))
+        row = np.repeat(np.arange(len(n)), taken)
+        with span("simulate"):
+            hits = simulate_hits(model, len(row), np.repeat(noise, taken), left_open, right_open, rng)
+        with span("histogram"):
+            position = (hits - np.repeat(lo, taken)) * np.repeat(scale, taken)
+            # The last bin includes its right edge, as in np.histogram
+            inside = (position >= 0) & (position <= bins)
+            index = np.minimum(position[inside].astype(np.int64), bins - 1)
+            counts += np.bincount(row[inside] * bins + index, minlength=len(n) * bins).reshape(len(n), bins)
+    return counts, edges
+
+
+def _single_rows(name, columns, rows, rng):
+    # Other particle simulators and the exact engine: one run per row
+    keys = [key for key in columns if key != "n"]
+    results = [simulate(name, int(columns["n"][row]), rng, **{key: columns[key][row:row + 1].tolist()[0] for key in keys})
+               for row in rows]
+    return np.array([c for c, _ in results], dtype=float), np.array([e for _, e in results], dtype=float)
+
+
+# --- Sweeps ---
+# Rows are grouped by every parameter but noise and n. Closed-form screens
+# on the multinomial engine are then evaluated as (rows × bins) arrays and
+# hits groups drawn in batches (above); the detector and double_slit
+# simulators and the exact engine run row by row. One generator feeds the
+# whole sweep, so a (grid, seed) pair is reproducible, but a row does not
+# match the single run with the same seed. Parameters left at a None default
+# (hits' range) get no column: the edges column holds what was used.
+def sweep(name, grid, n=3000, seed=None):
+    params = defaults(name)
+    unknown = set(grid) - set(params) - {"n"}
+    if unknown:
+        raise ValueError(f"Unknown parameters for {name!r}: {', '.join(sorted(unknown))}")
+    rng = _rng(None if seed is None else np.random.default_rng(seed))
+
+    columns = parameter_grid({"n": grid.get("n", n), **{k: v for k, v in grid.items() if k != "n"}})
+    rows = len(columns["n"])
+    columns["n"] = columns["n"].astype(np.int64)
+    for key, default in params.items():
+        columns.setdefault(key, np.full(rows, default))
+
+    fixed = [key for key in params if key != "noise"]
+    groups = {}
+    for row, values in enumerate(zip(*(columns[key].tolist() for key in fixed))):
+        groups.setdefault(values, []).append(row)
+
+    counts = edges = None
+    for values, group_rows in groups.items():
+        group_rows = np.array(group_rows)
+        group = dict(zip(fixed, values))
+        noise = columns["noise"][group_rows].astype(float)
+        result = None
+        if name in SCREENS and group.pop("engine") == "multinomial":
+            result = _screen_rows(name, group, noise, columns["n"][group_rows], rng)
+        elif name == "hits":
+            result = _hits_rows(group, noise, columns["n"][group_rows], rng)
+        block, block_edges = result or _single_rows(name, columns, group_rows, rng)
+        if counts is None:
+            counts, edges = np.zeros((rows, block.shape[1])), np.zeros((rows, block_edges.shape[1]))
+        elif block.shape[1] != counts.shape[1]:
+            raise ValueError("Every configuration of a sweep must have the same number of bins")
+        counts[group_rows], edges[group_rows] = block, block_edges
+
+    if counts is None:
+        counts, edges = np.zeros((0, 0)), np.zeros((0, 1))
+    columns = {key: values for key, values in columns.items() if values.dtype != object}
+    return {**columns, **summarize(counts, edges), "counts": counts, "edges": edges}
+
+
+# --- Columnar files ---
+# .npz holds one array per column; .parquet (needs pyarrow) one row per
+# configuration, with counts and edges as fixed-size list columns.
+def write_sweep(path, columns, meta=None):
+    path = pathlib.Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix == ".parquet":
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Writing .parquet needs pyarrow; use .npz instead") from None
+        arrays = {}
+        for key, values in columns.items():
+            if values.ndim == 2:
+                arrays[key] = pa.FixedSizeListArray.from_arrays(pa.array(values.ravel()), values.shape[1])
+            else:
+                arrays[key] = pa.array(values.tolist())
+        table = pa.table(arrays).replace_schema_metadata({"meta": json.dumps(meta or {})})
+        pq.write_table(table, path)
+    else:
+        np.savez(path, **columns, meta=json.dumps(meta or {}))
+    return path
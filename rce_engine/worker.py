@@ -0,0 +1,119 @@
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from .cache import RESULTS, _run_key
+from .simulators import CHUNK, stream
+
+# Background simulation threads shared by every session of the process
+WORKERS = int(os.environ.get("RCE_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _executor():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="rce-sim")
+        return _pool
+
+
+# --- Background jobs ---
+# One streamed run on the worker pool. latest holds (particles done, running
+# histogram, edges) and is replaced after every chunk, so a reader never sees
+# a half-updated result. cancel() stops the run at its next chunk boundary;
+# only runs that reach the end are stored in RESULTS, under the same key as
+# cached_simulate / cached_stream. A run already there is looked up on the
+# spot: the job starts finished, without a trip through the pool. The worker
+# thread has no recorder (they are not thread-safe): the run is timed as a
+# whole, and the session that collects it records that time as one span.
+class Job:
+    def __init__(self, name, n, chunk=CHUNK, seed=None, **params):
+        self.key = _run_key(name, n, chunk, params, seed)
+        self.n = n
+        self.latest = None
+        self.error = None
+        self.seconds = None
+        self._cancelled = threading.Event()
+        try:
+            counts, edges = RESULTS.get(self.key)
+        except KeyError:
+            self._future = _executor().submit(self._run, name, n, chunk, seed, params)
+        else:
+            self.latest = (n, counts, edges)
+            self._future = Future()
+            self._future.set_result(None)
+
+    def _run(self, name, n, chunk, seed, params):
+        start = time.perf_counter()
+        try:
+            for done, counts, edges in stream(name, n, chunk, seed, **params):
+                if self._cancelled.is_set():
+                    return
+                self.latest = (done, counts, edges)
+            RESULTS.put(self.key, (counts, edges))
+            self.seconds = time.perf_counter() - start
+        except Exception as exc:
+            self.error = exc
+
+    def collect(self):
+        # Worker seconds of a finished run, handed out once
+        seconds, self.seconds = self.seconds, None
+        return seconds
+
+    @property
+    def done(self):
+        return 0 if self.latest is None else self.latest[0]
+
+    @property
+    def finished(self):
+        return self._future.done() and not self._cancelled.is_set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+        self._future.cancel()
+
+
+# --- Latest-wins runner ---
+# Holds the job of one view (a Streamlit session's screen, say). Submitting
+# other parameters cancels the job in flight; the last finished result stays
+# available to show until the new one completes.
+class Runner:
+    def __init__(self):
+        self.job = None
+        self.last = None
+
+    def submit(self, name, n, chunk=CHUNK, seed=None, **params):
+        job = self.job
+        if job is not None and job.key == _run_key(name, n, chunk, params, seed) and not job.cancelled:
+            return job
+        if job is not None:
+            if job.finished and job.error is None:
+                self.last = job.latest
+            else:
+                job.cancel()
+        self.job = Job(name, n, chunk, seed, **params)
+        return self.job
+
+    def view(self):
+        # The current job's result once finished, else the last finished
+        # one, else the current job's partial histogram (None before its
+        # first chunk)
+        job = self.job
+        if job is None:
+            return self.last
+        if job.finished and job.error is None:
+            self.last = job.latest
+            return self.last
+        return self.last if self.last is not None else job.latest
+
+    def cancel(self):
+        if self.job is not None and not self.job.finished:
+            self.job.cancel()
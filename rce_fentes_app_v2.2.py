@@ -1,12 +1,13 @@
 
 import streamlit as st
-import numpy as np
 import matplotlib.pyplot as plt
-import networkx as nx
 import plotly.graph_objects as go
-import math
+
+from rce_engine import bin_centres, cached_simulate, span
+from rce_ui import perf_panel, perf_start, seed_input
 
 st.set_page_config(page_title="Double Slit Simulation – RCE Theory", layout="wide")
+perf = perf_start()
 
 # Intro section
 st.title("Double Slit Experiment – Classical vs Relational Coherence Interpretation")
@@ -26,81 +27,60 @@ noise_level = st.sidebar.slider("Experimental noise level", 0.0, 1.0, 0.1)
 slit_left_open = st.sidebar.checkbox("Left slit open", value=True)
 slit_right_open = st.sidebar.checkbox("Right slit open", value=True)
 interpretation = st.sidebar.radio("Interpretation model", ["Classical (Instrumentalist)", "RCE (Relational Coherence)"])
+seed = seed_input()
 
 # Double slit simulation
-def simulate_double_slit(n, noise, left_open=True, right_open=True, mode="classical"):
-    screen = np.zeros(1000)
-    positions = np.linspace(-1, 1, 1000)
-
-    for _ in range(n):
-        if not (left_open or right_open):
-            continue
-
-        if left_open and right_open:
-            phase = np.pi * np.random.rand()
-            if mode == "rce":
-                p = np.cos(5 * positions + phase)**2 + noise * np.random.rand(len(positions))
-            else:
-                p = np.sin(10 * positions + phase)**2 + noise * np.random.rand(len(positions))
-        elif left_open:
-            p = np.exp(-((positions + 0.3)**2) / 0.01)
-        elif right_open:
-            p = np.exp(-((positions - 0.3)**2) / 0.01)
-
-        p = p / np.sum(p)
-        index = np.random.choice(range(1000), p=p)
-        screen[index] += 1
-
-    return positions, screen
-
-positions, screen = simulate_double_slit(num_particles, noise_level, slit_left_open, slit_right_open, "rce" if "RCE" in interpretation else "classical")
+screen, edges = cached_simulate("double_slit", num_particles, seed, noise=noise_level,
+                                left_open=slit_left_open, right_open=slit_right_open,
+                                mode="rce" if "RCE" in interpretation else "classical")
+positions = bin_centres(edges)
 
 # Plot the result
-fig, ax = plt.subplots()
-ax.plot(positions, screen)
-ax.set_title(f"Detection Pattern – {interpretation}")
-ax.set_xlabel("Screen position")
-ax.set_ylabel("Hits")
-st.pyplot(fig)
+with span("figure"):
+    fig, ax = plt.subplots()
+    ax.plot(positions, screen)
+    ax.set_title(f"Detection Pattern – {interpretation}")
+    ax.set_xlabel("Screen position")
+    ax.set_ylabel("Hits")
+with span("serialize"):
+    st.pyplot(fig)
 
 # Coherence Graph (RCE only)
 if "RCE" in interpretation:
+    from rce_engine import edge_coordinates, static_coherence_graph
     st.markdown("### RCE – Coherence Graph")
-    G = nx.DiGraph()
-    G.add_nodes_from(["Source", "Left slit", "Right slit", "Hit (left)", "Hit (right)", "Interference"])
-
-    edges = [("Source", "Left slit"), ("Source", "Right slit"),
-             ("Left slit", "Hit (left)"), ("Right slit", "Hit (right)"),
-             ("Source", "Interference")]
+    with span("graph"):
+        G = static_coherence_graph()
 
     pos = {
         "Source": (0, 0), "Left slit": (-1, -1), "Right slit": (1, -1),
         "Hit (left)": (-1.5, -2), "Hit (right)": (1.5, -2), "Interference": (0, 1)
     }
-
-    G.add_edges_from(edges)
-
-    node_trace = go.Scatter(
-        x=[pos[node][0] for node in G.nodes],
-        y=[pos[node][1] for node in G.nodes],
-        text=list(G.nodes),
-        mode="markers+text",
-        textposition="bottom center",
-        marker=dict(size=30, color="lightblue"),
-        hoverinfo="text"
-    )
-
-    edge_trace = go.Scatter(
-        x=sum([[pos[edge[0]][0], pos[edge[1]][0], None] for edge in edges], []),
-        y=sum([[pos[edge[0]][1], pos[edge[1]][1], None] for edge in edges], []),
-        mode="lines",
-        line=dict(width=2, color="gray"),
-        hoverinfo="none"
-    )
-
-    fig = go.Figure(data=[edge_trace, node_trace])
-    fig.update_layout(title="Relational Coherence Graph", showlegend=False, margin=dict(l=40, r=40, t=40, b=40))
-    st.plotly_chart(fig, use_container_width=True)
+    with span("figure"):
+        edge_x, edge_y = edge_coordinates(G, pos)
+
+        node_trace = go.Scatter(
+            x=[pos[node][0] for node in G.nodes],
+            y=[pos[node][1] for node in G.nodes],
+            text=list(G.nodes),
+            mode="markers+text",
+            textposition="bottom center",
+            marker=dict(size=30, color="lightblue"),
+            hoverinfo="text"
+        )
+
+        edge_trace = go.Scatter(
+            x=edge_x,
+            y=edge_y,
+            mode="lines",
+            line=dict(width=2, color="gray"),
+            hoverinfo="none"
+        )
+
+        fig = go.Figure(data=[edge_trace, node_trace])
+        fig.update_layout(title="Relational Coherence Graph", showlegend=False, margin=dict(l=40, r=40, t=40, b=40))
+    with span("serialize"):
+        st.plotly_chart(fig, use_container_width=True)
 
 # Reference section
 st.markdown("""
@@ -109,3 +89,5 @@ st.markdown("""
 - Relational Coherence Theory: `https://github.com/yourname/rce-fentes`
 - Author: **IKAMI**, contact: `ikami.research@proton.me`
 """)
+
+perf_panel(perf)
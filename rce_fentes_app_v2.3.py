@@ -1,8 +1,11 @@
 import streamlit as st
 import plotly.graph_objects as go
-import numpy as np
+
+from rce_engine import span
+from rce_ui import background_run, fragment, panel_figure, perf_panel, perf_start, seed_input
 
 st.set_page_config(layout="wide", page_title="Relational Coherence Engine – Double Slit Simulation")
+perf = perf_start()
 
 # --- Intro page ---
 st.title("🌌 Double Slit Experiment – Classical vs Relational Coherence")
@@ -47,8 +50,6 @@ Where \( \mathcal{P} \) is the set of all coherent paths from Source to Detectio
 # --- Parameters ---
 st.sidebar.header("🧪 Experiment Parameters")
 
-num_particles = st.sidebar.slider("Number of particles", 100, 10000, 1000, step=100)
-noise_level = st.sidebar.slider("Experimental noise level", 0.0, 1.0, 0.1, step=0.05)
 left_slit_open = st.sidebar.checkbox("Left slit open", value=True)
 right_slit_open = st.sidebar.checkbox("Right slit open", value=True)
 
@@ -58,83 +59,97 @@ model_choice = st.sidebar.radio("Interpretation mode", [
     "Many Worlds (Everett)",
     "QBism (subjective Bayesian)"
 ], index=1)
+seed = seed_input()
 
 # --- Core Simulation Logic ---
-def simulate_hits(model, n, noise, left_open, right_open):
-    x_hits = []
-
-    for _ in range(n):
-        if model == "Classical (with collapse)":
-            if not (left_open or right_open):
-                continue
-            slit = np.random.choice(["L", "R"])
-            if slit == "L" and left_open:
-                x = np.random.normal(loc=-0.5, scale=0.3)
-            elif slit == "R" and right_open:
-                x = np.random.normal(loc=0.5, scale=0.3)
-            else:
-                continue
-        elif model == "RCE (Relational Coherence)":
-            if left_open and right_open:
-                phase = np.random.uniform(0, 2*np.pi)
-                x = np.sin(20 * phase) + np.random.normal(0, noise)
-            elif left_open:
-                x = np.random.normal(loc=-0.5, scale=0.3)
-            elif right_open:
-                x = np.random.normal(loc=0.5, scale=0.3)
-            else:
-                continue
-        elif model == "Many Worlds (Everett)":
-            x = np.random.uniform(-1, 1)
-        elif model == "QBism (subjective Bayesian)":
-            bias = np.random.beta(2, 5)
-            x = np.random.normal(loc=bias - 0.5, scale=0.5)
-        x_hits.append(x)
-    return np.array(x_hits)
-
-# --- Simulation ---
-hits = simulate_hits(model_choice, num_particles, noise_level, left_slit_open, right_slit_open)
-hist_vals, bins = np.histogram(hits, bins=50)
-
-# --- Plotting ---
-fig = go.Figure()
-fig.add_trace(go.Bar(x=bins[:-1], y=hist_vals, marker_color='lightblue'))
-fig.update_layout(title=f"Detection Screen – {model_choice}", xaxis_title="Position", yaxis_title="Count", height=400)
-
-st.plotly_chart(fig, use_container_width=True)
+MODEL_KEYS = {
+    "Classical (with collapse)": "classical",
+    "RCE (Relational Coherence)": "rce",
+    "Many Worlds (Everett)": "many_worlds",
+    "QBism (subjective Bayesian)": "qbism",
+}
+
+# Particles per redraw of the detection screen while it fills
+STREAM_CHUNK = 1000
+
+# --- Simulation and plotting ---
+def plot_screen(done, hist_vals, bins):
+    with span("figure"):
+        fig = go.Figure()
+        fig.add_trace(go.Bar(x=bins[:-1], y=hist_vals, marker_color='lightblue'))
+        fig.update_layout(title=f"Detection Screen – {model_choice} ({done} particles)",
+                          xaxis_title="Position", yaxis_title="Count", height=400)
+    with span("serialize"):
+        st.plotly_chart(fig, use_container_width=True)
+
+# Particles and noise only feed the screen: they live in its panel, and
+# moving them reruns that panel alone
+@fragment
+def screen_panel():
+    col_particles, col_noise = st.columns(2)
+    num_particles = col_particles.slider("Number of particles", 100, 10000, 1000, step=100)
+    noise_level = col_noise.slider("Experimental noise level", 0.0, 1.0, 0.1, step=0.05)
+    background_run("screen", "hits", num_particles, plot_screen, chunk=STREAM_CHUNK, seed=seed,
+                   model=MODEL_KEYS[model_choice], noise=noise_level,
+                   left_open=left_slit_open, right_open=right_slit_open)
+
+
+def graph_figure(closed):
+    from rce_engine import (
+        actualization_paths,
+        actualization_probabilities,
+        context_mu,
+        edge_coordinates,
+        layout,
+        node_coordinates,
+        path_edges,
+        warm_layouts,
+        weighted_coherence_graph,
+    )
+    warm_layouts()
+    with span("graph"):
+        G = weighted_coherence_graph()
+        # A closed slit removes its node, and the interference node needs
+        # both slits: the path and the probabilities use the same μ
+        mu = context_mu(G, [closed])
+        labels, probabilities = actualization_probabilities(G, "Source", mu)
+        hits = {label: p for label, p in zip(labels, probabilities[0]) if label.startswith("Hit")}
+
+    pos = layout(G)
+    with span("figure"):
+        edge_x, edge_y = edge_coordinates(G, pos)
+        node_x, node_y, node_labels = node_coordinates(G, pos)
+
+        # Actualization path A = argmax ∏ μ(e), highlighted over the graph
+        path, coherence = actualization_paths(G, [("Source", ["Hit (left)", "Hit (right)"])], mu=mu)[0][0]
+        path_x, path_y = edge_coordinates(G, pos, path_edges(path))
+
+        edge_trace = go.Scatter(x=edge_x, y=edge_y, line=dict(width=1), hoverinfo='none', mode='lines')
+        path_trace = go.Scatter(x=path_x, y=path_y, line=dict(width=4, color='crimson'), hoverinfo='none', mode='lines')
+        node_trace = go.Scatter(x=node_x, y=node_y, mode='markers+text', marker=dict(size=20, color='lightblue'),
+                                text=node_labels, textposition="bottom center")
+
+        fig_graph = go.Figure(data=[edge_trace, path_trace, node_trace])
+        fig_graph.update_layout(title="RCE – Coherence Graph", showlegend=False, height=500)
+    return fig_graph, path, coherence, hits
+
+
+screen_panel()
 
 # --- Coherence Graph for RCE ---
 if model_choice == "RCE (Relational Coherence)":
-    import networkx as nx
-    import plotly.graph_objects as go
-
-    G = nx.DiGraph()
-    G.add_edges_from([
-        ("Source", "Left slit", {"mu": 0.9}),
-        ("Source", "Right slit", {"mu": 0.9}),
-        ("Left slit", "Hit (left)", {"mu": 0.7}),
-        ("Right slit", "Hit (right)", {"mu": 0.7}),
-        ("Source", "Interference", {"mu": 0.3}),
-        ("Interference", "Hit (left)", {"mu": 0.2}),
-        ("Interference", "Hit (right)", {"mu": 0.2}),
-    ])
-
-    pos = nx.spring_layout(G)
-    edge_x, edge_y = [], []
-    for edge in G.edges():
-        x0, y0 = pos[edge[0]]
-        x1, y1 = pos[edge[1]]
-        edge_x += [x0, x1, None]
-        edge_y += [y0, y1, None]
-
-    node_x, node_y = zip(*[pos[node] for node in G.nodes()])
-    node_labels = list(G.nodes())
-
-    edge_trace = go.Scatter(x=edge_x, y=edge_y, line=dict(width=1), hoverinfo='none', mode='lines')
-    node_trace = go.Scatter(x=node_x, y=node_y, mode='markers+text', marker=dict(size=20, color='lightblue'),
-                            text=node_labels, textposition="bottom center")
-
-    fig_graph = go.Figure(data=[edge_trace, node_trace])
-    fig_graph.update_layout(title="RCE – Coherence Graph", showlegend=False, height=500)
-
-    st.plotly_chart(fig_graph, use_container_width=True)
\ No newline at end of file
+    # Only the closed slits change the graph's μ: it is rebuilt when they do
+    closed = tuple(slit for slit, is_open in (("Left slit", left_slit_open), ("Right slit", right_slit_open))
+                   if not is_open)
+    if closed:
+        closed += ("Interference",)
+    fig_graph, path, coherence, hits = panel_figure("weighted_graph", closed, lambda: graph_figure(closed))
+    with span("serialize"):
+        st.plotly_chart(fig_graph, use_container_width=True)
+    if path:
+        st.caption(f"Actualization path: {' → '.join(path)} (∏μ = {coherence:.2f})")
+    else:
+        st.caption("Actualization path: none, no hit is coherently reachable")
+    st.caption("Actualization probabilities: " + " · ".join(f"{label} {p:.0%}" for label, p in hits.items()))
+
+perf_panel(perf)
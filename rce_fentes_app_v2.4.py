@@ -2,10 +2,13 @@
 import streamlit as st
 import plotly.graph_objects as go
 import numpy as np
-import networkx as nx
-import random
+
+from rce_engine import CounterRNG, bin_centres, cached_simulate, coherence_screen, noisy, span
+from rce_engine.figures import line_trace
+from rce_ui import perf_panel, perf_start, seed_input
 
 st.set_page_config(layout="wide")
+perf = perf_start()
 
 # ---- Title and Attribution ----
 st.title("Double-Slit Experiment Simulation")
@@ -50,88 +53,76 @@ model_choice = st.sidebar.radio("Interpretation mode", [
     "Relational Coherence Engine (RCE)"
 ])
 
+# Either the closed-form intensity, or num_particles detections drawn from it
+SCREEN_ENGINES = {"Expected pattern (multinomial)": "multinomial", "Exact per-particle": "exact"}
+screen_output = st.sidebar.radio("Screen output", ["Intensity curve"] + list(SCREEN_ENGINES))
+seed = seed_input()
+
 # ---- Simulation Core ----
+MODEL_KEYS = {"Classical / Quantum Mechanics": "classical", "Relational Coherence Engine (RCE)": "rce"}
+
 def simulate_hits(model, noise):
-    if model == "Classical / Quantum Mechanics":
-        # interference pattern: central max + noise
-        x = np.linspace(-1, 1, 1000)
-        intensity = np.cos(5 * np.pi * x)**2
-        intensity += np.random.normal(0, noise, size=1000)
-    else:
-        # coherence zones only where context aligns
+    # The noise realisation a sampled screen with this seed is drawn from
+    with span("simulate"):
         x = np.linspace(-1, 1, 1000)
-        coherence = np.exp(-((x-0.3)**2)/0.02) + np.exp(-((x+0.3)**2)/0.02)
-        intensity = coherence + np.random.normal(0, noise, size=1000)
-    intensity = np.maximum(intensity, 0)
-    return x, intensity
+        return x, noisy(coherence_screen(x, MODEL_KEYS[model]), noise, CounterRNG(seed).setup())
 
-x, y = simulate_hits(model_choice, noise_level)
+if screen_output in SCREEN_ENGINES:
+    # Counts per bin of the simulator's screen, drawn at the bin centres
+    y, edges = cached_simulate("coherence", num_particles, seed, model=MODEL_KEYS[model_choice], noise=noise_level,
+                               engine=SCREEN_ENGINES[screen_output])
+    x, y_title = bin_centres(edges), "Detection count"
+else:
+    x, y = simulate_hits(model_choice, noise_level)
+    y_title = "Detection intensity"
 
 # ---- Display Plot ----
-fig = go.Figure()
-fig.add_trace(go.Scatter(x=x, y=y, mode='lines', name='Detection intensity'))
-fig.update_layout(title="Observed pattern on detection screen",
-                  xaxis_title="Position on screen",
-                  yaxis_title="Detection intensity",
-                  height=400)
-st.plotly_chart(fig, use_container_width=True)
+with span("figure"):
+    fig = go.Figure()
+    fig.add_trace(line_trace(x, y, mode='lines', name='Detection intensity'))
+    fig.update_layout(title="Observed pattern on detection screen",
+                      xaxis_title="Position on screen",
+                      yaxis_title=y_title,
+                      height=400)
+with span("serialize"):
+    st.plotly_chart(fig, use_container_width=True)
 
 # ---- Optional Graph View of Coherence ----
 if model_choice == "Relational Coherence Engine (RCE)":
+    from rce_engine import edge_coordinates, layout, node_coordinates, static_coherence_graph, warm_layouts
+    warm_layouts()
     st.markdown("### RCE – Coherence Graph")
-    G = nx.DiGraph()
-
-    # Nodes with potential coherence
-    G.add_node("Source")
-    G.add_node("Left slit")
-    G.add_node("Right slit")
-    G.add_node("Hit (left)")
-    G.add_node("Hit (right)")
-    G.add_node("Interference")
-
-    G.add_edges_from([
-        ("Source", "Left slit"),
-        ("Source", "Right slit"),
-        ("Left slit", "Hit (left)"),
-        ("Right slit", "Hit (right)"),
-        ("Source", "Interference")
-    ])
-
-    pos = nx.spring_layout(G, seed=42)
-    edge_x = []
-    edge_y = []
-    for edge in G.edges():
-        x0, y0 = pos[edge[0]]
-        x1, y1 = pos[edge[1]]
-        edge_x += [x0, x1, None]
-        edge_y += [y0, y1, None]
-
-    edge_trace = go.Scatter(
-        x=edge_x, y=edge_y,
-        line=dict(width=1, color='#888'),
-        hoverinfo='none',
-        mode='lines')
-
-    node_x = []
-    node_y = []
-    for node in G.nodes():
-        x, y = pos[node]
-        node_x.append(x)
-        node_y.append(y)
-
-    node_trace = go.Scatter(
-        x=node_x, y=node_y,
-        mode='markers+text',
-        text=list(G.nodes),
-        textposition="bottom center",
-        marker=dict(size=30, color='skyblue'),
-        hoverinfo='text')
-
-    coherence_fig = go.Figure(data=[edge_trace, node_trace],
-                              layout=go.Layout(
-                                  showlegend=False,
-                                  hovermode='closest',
-                                  margin=dict(b=20,l=5,r=5,t=40),
-                                  xaxis=dict(showgrid=False, zeroline=False),
-                                  yaxis=dict(showgrid=False, zeroline=False)))
-    st.plotly_chart(coherence_fig, use_container_width=True)
+    with span("graph"):
+        G = static_coherence_graph()
+
+    pos = layout(G)
+    with span("figure"):
+        edge_x, edge_y = edge_coordinates(G, pos)
+
+        edge_trace = go.Scatter(
+            x=edge_x, y=edge_y,
+            line=dict(width=1, color='#888'),
+            hoverinfo='none',
+            mode='lines')
+
+        node_x, node_y, _ = node_coordinates(G, pos)
+
+        node_trace = go.Scatter(
+            x=node_x, y=node_y,
+            mode='markers+text',
+            text=list(G.nodes),
+            textposition="bottom center",
+            marker=dict(size=30, color='skyblue'),
+            hoverinfo='text')
+
+        coherence_fig = go.Figure(data=[edge_trace, node_trace],
+                                  layout=go.Layout(
+                                      showlegend=False,
+                                      hovermode='closest',
+                                      margin=dict(b=20,l=5,r=5,t=40),
+                                      xaxis=dict(showgrid=False, zeroline=False),
+                                      yaxis=dict(showgrid=False, zeroline=False)))
+    with span("serialize"):
+        st.plotly_chart(coherence_fig, use_container_width=True)
+
+perf_panel(perf)
@@ -1,11 +1,14 @@
 
 import streamlit as st
-import networkx as nx
 import plotly.graph_objects as go
-import numpy as np
-import random
+
+from rce_engine import generate_coherence_graph, span, warm_layouts
+from rce_engine.figures import plot_coherence_graph
+from rce_ui import background_run, fragment, live_layout, panel_figure, perf_panel, perf_start, seed_input
 
 st.set_page_config(layout="wide")
+perf = perf_start()
+warm_layouts()
 
 # Title and author
 st.title("Relational Coherence Engine (RCE) – Double Slit Simulation")
@@ -28,81 +31,51 @@ with st.expander("🧠 About the RCE Paradigm"):
 
 # Sidebar controls
 st.sidebar.header("Simulation parameters")
-n_particles = st.sidebar.slider("Number of particles", 100, 10000, 3000, step=100)
-noise_level = st.sidebar.slider("Experimental noise level", 0.0, 1.0, 0.1, step=0.01)
 left_open = st.sidebar.checkbox("Left slit open", value=True)
 right_open = st.sidebar.checkbox("Right slit open", value=True)
 interpretation = st.sidebar.radio("Interpretation model", ["Classical QM", "RCE (Relational Coherence)", "Many Worlds", "Copenhagen", "QBism"])
-
-# Coherence Graph Construction
-def generate_coherence_graph():
-    G = nx.Graph()
-    G.add_node("Source")
-    if left_open:
-        G.add_edge("Source", "Left slit")
-        G.add_edge("Left slit", "Hit (left)")
-    if right_open:
-        G.add_edge("Source", "Right slit")
-        G.add_edge("Right slit", "Hit (right)")
-    G.add_edge("Source", "Interference")
-    return G
-
-def plot_coherence_graph(G):
-    pos = nx.spring_layout(G, seed=42)
-    edge_x, edge_y = [], []
-    for edge in G.edges():
-        x0, y0 = pos[edge[0]]
-        x1, y1 = pos[edge[1]]
-        edge_x += [x0, x1, None]
-        edge_y += [y0, y1, None]
-
-    edge_trace = go.Scatter(x=edge_x, y=edge_y, line=dict(width=1), hoverinfo='none', mode='lines')
-
-    node_x, node_y, node_text = [], [], []
-    for node in G.nodes():
-        x, y = pos[node]
-        node_x.append(x)
-        node_y.append(y)
-        node_text.append(node)
-
-    node_trace = go.Scatter(
-        x=node_x, y=node_y, mode='markers+text', text=node_text, textposition='top center',
-        hoverinfo='text', marker=dict(size=30, color='lightblue', line=dict(width=2)))
-
-    fig = go.Figure(data=[edge_trace, node_trace])
-    fig.update_layout(showlegend=False, margin=dict(l=20, r=20, t=40, b=20), height=400)
-    return fig
+seed = seed_input()
 
 # Outcome calculation
-def simulate_hits_rce():
-    hits = np.zeros(100)
-    for _ in range(n_particles):
-        if not left_open and not right_open:
-            continue
-        coherence = (left_open + right_open) / 2
-        idx = int(50 + 40 * np.sin(random.uniform(0, np.pi * 2)) * coherence)
-        idx = min(max(idx + int(np.random.normal(0, noise_level * 10)), 0), 99)
-        hits[idx] += 1
-    return hits
-
-def plot_results(hits):
+STREAM_CHUNK = 1000  # particles per redraw while the detector fills
+
+def plot_results(hits, chart):
+    with span("figure"):
+        fig = go.Figure()
+        fig.add_trace(go.Bar(y=hits, marker_color='indigo', name="Hits"))
+        fig.update_layout(height=300, xaxis_title="Detector position", yaxis_title="Hit count")
+    with span("serialize"):
+        chart.plotly_chart(fig, use_container_width=True)
+
+# The particle count and noise only feed the observed pattern: they live in
+# its panel, and moving them reruns that panel alone
+@fragment
+def screen_panel():
     st.subheader("Observed pattern")
-    fig = go.Figure()
-    fig.add_trace(go.Bar(y=hits, marker_color='indigo', name="Hits"))
-    fig.update_layout(height=300, xaxis_title="Detector position", yaxis_title="Hit count")
-    st.plotly_chart(fig, use_container_width=True)
+    col_particles, col_noise = st.columns(2)
+    n_particles = col_particles.slider("Number of particles", 100, 10000, 3000, step=100)
+    noise_level = col_noise.slider("Experimental noise level", 0.0, 1.0, 0.1, step=0.01)
+    background_run("screen", "detector", n_particles, lambda done, hits, edges: plot_results(hits, st),
+                   chunk=STREAM_CHUNK, seed=seed, noise=noise_level, left_open=left_open, right_open=right_open)
+
+
+def graph_figure():
+    with span("graph"):
+        G = generate_coherence_graph(left_open, right_open)
+    with span("figure"):
+        return plot_coherence_graph(G, live_layout("coherence_graph", G))
+
 
 # Main logic
 col1, col2 = st.columns([1, 2])
 with col1:
-    G = generate_coherence_graph()
-    fig = plot_coherence_graph(G)
+    fig = panel_figure("coherence_graph", (left_open, right_open), graph_figure)
     st.markdown("### RCE – Coherence Graph")
-    st.plotly_chart(fig, use_container_width=True)
+    with span("serialize"):
+        st.plotly_chart(fig, use_container_width=True)
 
 with col2:
-    hits = simulate_hits_rce()
-    plot_results(hits)
+    screen_panel()
 
 # Interpretation insights
 st.markdown("### Interpretation comparison")
@@ -126,3 +99,5 @@ st.table({
 # Footer
 st.markdown("---")
 st.caption("Simulation engine developed by **Ismail Sialyen** | 2025 ©")
+
+perf_panel(perf)
@@ -1,11 +1,14 @@
 
 import streamlit as st
-import plotly.graph_objects as go
-import numpy as np
-import networkx as nx
+
+from rce_engine import arrivals, cached_simulate, memoize, span
+from rce_engine.detector2d import detect_2d
+from rce_engine.figures import plot_arrivals, plot_distribution, plot_heatmap, plot_rce_graph
+from rce_ui import fragment, keep, live_layout, panel_figure, perf_panel, perf_start, seed_input
 
 # --- Paramètres utilisateur ---
 st.set_page_config(page_title="Double-Slit Simulator", layout="wide")
+perf = perf_start()
 st.title("🧪 Double-Slit Experiment Simulator – Quantum vs RCE")
 
 st.markdown("This professional simulator lets you explore how the double-slit behaves under standard quantum interpretation vs a relational logic engine (RCE).")
@@ -23,105 +26,111 @@ detecteur_droite = st.sidebar.checkbox("Detector at right slit")
 # Intensité du faisceau
 intensite = st.sidebar.slider("Source intensity (particles)", 100, 10000, 3000, step=100)
 
-# Présence de bruit
-bruit = st.sidebar.slider("Experimental noise level", 0.0, 1.0, 0.1, step=0.01)
-
 # Mode d'interprétation
 mode = st.sidebar.radio("Interpretation mode", ["Quantum Mechanics", "RCE (Relational Coherence)"])
+seed = seed_input()
 
-# --- Génération des impacts (quantique) ---
-def generate_interference(intensity, noise_level, both_slits, detector=False):
-    x = np.linspace(-1, 1, 500)
-    screen = np.zeros_like(x)
+# Les réglages propres à un panneau vivent dans ce panneau : les changer ne
+# relance que lui
+keep("bruit", "engine", "animer", "particules", "images", "ecran_2d", "resolution")
+
+# Moteur d'échantillonnage de l'écran
+SCREEN_ENGINES = {"Expected pattern (multinomial)": "multinomial", "Exact per-particle": "exact"}
+
+# Heatmap cells actually sent to the browser, whatever the screen resolution
+HEATMAP_SIZE = 256
+
+# Particules de l'animation des impacts, indépendantes de l'intensité
+ANIMATION_PARTICLES = [1_000, 10_000, 100_000, 1_000_000]
+
+
+@memoize
+def detector_heatmap(n, resolution, slits, rng=None):
+    acc, x_edges, y_edges = detect_2d(n, (resolution, resolution), slits=slits, rng=rng)
+    step = resolution // HEATMAP_SIZE
+    return acc.downsample((HEATMAP_SIZE, HEATMAP_SIZE)), x_edges[::step], y_edges[::step]
+
+
+@memoize
+def arrival_frames(n, frames, noise, left_open, right_open, detector, engine, rng=None):
+    return arrivals("interference", n, frames, rng, noise=noise, left_open=left_open, right_open=right_open,
+                    detector=detector, engine=engine)
 
-    if both_slits and not detector:
-        # Interference pattern (sin^2)
-        pattern = (np.sin(10 * x) ** 2)
-        screen += pattern
-    else:
-        # Single-slit or collapsed wave
-        screen += np.exp(-((x - 0.3)**2) * 20) * fente_droite
-        screen += np.exp(-((x + 0.3)**2) * 20) * fente_gauche
-
-    screen += np.random.normal(0, noise_level, size=x.shape)
-    screen = np.maximum(0, screen)
-
-    hits = np.random.choice(x, size=intensity, p=screen/screen.sum())
-    return hits
-
-# --- Visualisation 1 : Résultat sur écran (quantique) ---
-def plot_distribution(hits, title):
-    hist, bins = np.histogram(hits, bins=100, range=(-1, 1))
-    fig = go.Figure()
-    fig.add_trace(go.Bar(x=(bins[:-1] + bins[1:]) / 2, y=hist, marker_color='blue'))
-    fig.update_layout(title=title, xaxis_title="Screen position", yaxis_title="Count", height=400)
-    return fig
-
-# --- Visualisation 2 : Graphe relationnel (RCE) ---
-def plot_rce_graph(left, right, detector_left, detector_right):
-    G = nx.DiGraph()
-    G.add_node("Source")
-
-    if left:
-        G.add_node("Left slit")
-        if not detector_left:
-            G.add_edge("Source", "Left slit")
-            G.add_node("Hit (left)")
-            G.add_edge("Left slit", "Hit (left)")
-
-    if right:
-        G.add_node("Right slit")
-        if not detector_right:
-            G.add_edge("Source", "Right slit")
-            G.add_node("Hit (right)")
-            G.add_edge("Right slit", "Hit (right)")
-
-    if left and right and not (detector_left or detector_right):
-        G.add_node("Interference")
-        G.add_edge("Source", "Interference")
-
-    pos = nx.spring_layout(G, seed=42)
-    edge_x, edge_y = [], []
-    for edge in G.edges():
-        x0, y0 = pos[edge[0]]
-        x1, y1 = pos[edge[1]]
-        edge_x += [x0, x1, None]
-        edge_y += [y0, y1, None]
-
-    node_x, node_y = zip(*[pos[n] for n in G.nodes()])
-    node_text = list(G.nodes())
-
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=edge_x, y=edge_y,
-                             line=dict(width=1, color='gray'),
-                             hoverinfo='none',
-                             mode='lines'))
-    fig.add_trace(go.Scatter(x=node_x, y=node_y,
-                             mode='markers+text',
-                             marker=dict(size=40, color='skyblue'),
-                             text=node_text,
-                             textposition="top center"))
-    fig.update_layout(title="RCE – Coherence Graph", height=400,
-                      xaxis=dict(visible=False), yaxis=dict(visible=False))
-    return fig
 
 # --- Simulation ---
 slits_open = fente_gauche + fente_droite
 detecteurs_actifs = detecteur_gauche or detecteur_droite
 both_slits = fente_gauche and fente_droite
 
-# Quantum mode
-if mode == "Quantum Mechanics":
-    hits = generate_interference(intensite, bruit, both_slits, detecteurs_actifs)
-    fig1 = plot_distribution(hits, "Quantum screen pattern")
 
-# RCE mode
-else:
-    fig1 = plot_rce_graph(fente_gauche, fente_droite, detecteur_gauche, detecteur_droite)
+# Quantum mode: the screen depends on the sidebar plus its own noise and engine
+@fragment
+def quantum_panel():
+    col_noise, col_engine = st.columns(2)
+    bruit = col_noise.slider("Experimental noise level", 0.0, 1.0, 0.1, step=0.01, key="bruit")
+    engine = col_engine.radio("Screen sampling", list(SCREEN_ENGINES), key="engine", horizontal=True)
+
+    # Animation des impacts : l'écran se remplit particule après particule
+    if st.toggle("Animate arrivals", key="animer"):
+        col_particles, col_frames = st.columns(2)
+        particules = col_particles.select_slider("Particles to animate", ANIMATION_PARTICLES, value=100_000,
+                                                 key="particules")
+        images = col_frames.slider("Frames", 20, 500, 100, step=10, key="images")
+        deltas, edges, bounds = arrival_frames(particules, images, bruit, fente_gauche, fente_droite,
+                                               detecteurs_actifs, SCREEN_ENGINES[engine], seed=seed)
+        with span("figure"):
+            fig = plot_arrivals(deltas, edges, bounds, "Quantum screen pattern")
+    else:
+        counts, bins = cached_simulate("interference", intensite, seed, noise=bruit,
+                                       left_open=fente_gauche, right_open=fente_droite,
+                                       detector=detecteurs_actifs, engine=SCREEN_ENGINES[engine])
+        with span("figure"):
+            fig = plot_distribution(counts, bins, "Quantum screen pattern")
+    with span("serialize"):
+        st.plotly_chart(fig, use_container_width=True)
+
+
+# Écran 2-D (fentes rectangulaires): its own toggle and resolution
+@fragment
+def detector_panel():
+    col_toggle, col_resolution = st.columns(2)
+    ecran_2d = col_toggle.checkbox("2-D detector screen", key="ecran_2d")
+    resolution = col_resolution.select_slider("2-D screen resolution", [256, 512, 1024, 2048, 4096, 8192],
+                                              value=1024, disabled=not ecran_2d, key="resolution")
+    # Les détecteurs (ou une seule fente) ne laissent que l'enveloppe d'une fente
+    if ecran_2d and slits_open:
+        image, x_edges, y_edges = detector_heatmap(intensite, resolution,
+                                                   2 if both_slits and not detecteurs_actifs else 1, seed=seed)
+        with span("figure"):
+            fig = plot_heatmap(image, x_edges, y_edges, f"2-D detector screen ({resolution}×{resolution})")
+        with span("serialize"):
+            st.plotly_chart(fig, use_container_width=True)
+
+
+def rce_graph_figure():
+    # networkx loads on the first RCE rerun only; quantum mode never needs it
+    from rce_engine import rce_graph, warm_layouts
+    warm_layouts()
+    with span("graph"):
+        pos = live_layout("rce_graph", rce_graph(fente_gauche, fente_droite, detecteur_gauche, detecteur_droite))
+    with span("figure"):
+        return plot_rce_graph(fente_gauche, fente_droite, detecteur_gauche, detecteur_droite, pos)
+
 
 # --- Affichage final ---
 st.markdown("### 4. Results")
-st.plotly_chart(fig1, use_container_width=True)
+if mode == "Quantum Mechanics":
+    quantum_panel()
+    detector_panel()
+else:
+    # The graph only depends on the slits and detectors: an intensity change
+    # does not rebuild it
+    fig = panel_figure("rce_graph", (fente_gauche, fente_droite, detecteur_gauche, detecteur_droite),
+                       rce_graph_figure)
+    with span("serialize"):
+        st.plotly_chart(fig, use_container_width=True)
 
 st.markdown("---")
 st.markdown("📘 This simulation compares the standard quantum mechanical interpretation with a new logic-based relational model (RCE).")
+
+perf_panel(perf)
@@ -1,32 +1,12 @@
 import streamlit as st
-import networkx as nx
-import matplotlib.pyplot as plt
 
 # --- Graph builder for relational structure ---
-def build_graph(context):
-    G = nx.DiGraph()
-    G.add_node("Source")
-
-    if context == "Left slit open":
-        G.add_node("Left slit")
-        G.add_node("Impact on screen (left)")
-        G.add_edge("Source", "Left slit")
-        G.add_edge("Left slit", "Impact on screen (left)")
-    elif context == "Right slit open":
-        G.add_node("Right slit")
-        G.add_node("Impact on screen (right)")
-        G.add_edge("Source", "Right slit")
-        G.add_edge("Right slit", "Impact on screen (right)")
-    elif context == "Both slits open":
-        G.add_node("Both slits")
-        G.add_node("Interference pattern")
-        G.add_edge("Source", "Both slits")
-        G.add_edge("Both slits", "Interference pattern")
-    
-    return G
+from rce_engine import span
+from rce_ui import live_layout, perf_panel, perf_start
 
 # --- App setup ---
 st.set_page_config(page_title="Double-slit: RCE vs Quantum", layout="wide")
+perf = perf_start()
 st.title("🧪 Double-slit Experiment — Standard Quantum vs RCE Interpretation")
 
 st.markdown("""
@@ -84,11 +64,20 @@ st.divider()
 # --- Step 3: Visualize the RCE graph ---
 st.markdown("### 3. Visualize the relational coherence graph:")
 
-G = build_graph(context_choice)
-fig, ax = plt.subplots(figsize=(8, 5))
-pos = nx.spring_layout(G, seed=42)
-nx.draw(G, pos, with_labels=True, node_color='skyblue', node_size=2000, font_size=10, arrows=True, ax=ax)
-st.pyplot(fig)
+# networkx and matplotlib load here, after the page above has been sent
+from rce_engine import build_graph, warm_layouts
+import matplotlib.pyplot as plt
+import networkx as nx
+
+warm_layouts()
+with span("graph"):
+    G = build_graph(context_choice)
+with span("figure"):
+    fig, ax = plt.subplots(figsize=(8, 5))
+    pos = live_layout("context_graph", G)
+    nx.draw(G, pos, with_labels=True, node_color='skyblue', node_size=2000, font_size=10, arrows=True, ax=ax)
+with span("serialize"):
+    st.pyplot(fig)
 
 # --- Final explanation ---
 st.info("""
@@ -97,3 +86,5 @@ within a potential structure (the graph). This avoids paradoxes like self-interf
 
 👉 This is a simplified simulation. The full mathematical formulation is available in the upcoming paper.
 """)
+
+perf_panel(perf)
@@ -0,0 +1,155 @@
+import functools
+import sys
+
+import streamlit as st
+
+from rce_engine.counters import CounterRNG
+from rce_engine.perf import Recorder, activate, deactivate, record
+from rce_engine.simulators import CHUNK
+from rce_engine.worker import Runner
+
+
+def _page():
+    # Script of the page calling into rce_ui (its __main__ globals): the pages
+    # of the multi-page app share one session, so the runs, figures and graphs
+    # kept in it are keyed by page as well, and never feed another page's
+    return sys._getframe(2).f_globals.get("__file__")
+
+
+# --- Performance panel ---
+# perf_start() opens the rerun's spans (call it right after set_page_config),
+# perf_panel() closes them and draws the optional sidebar panel (call it last).
+# The recorder lives in the session, so percentiles roll over its reruns.
+def perf_start():
+    if "rce_perf" not in st.session_state:
+        st.session_state.rce_perf = Recorder()
+    recorder = st.session_state.rce_perf
+    recorder.memory = st.session_state.get("rce_perf_memory", False)
+    recorder.start_run()
+    activate(recorder)
+    return recorder
+
+
+def fragment(fn=None, *, run_every=None):
+    # st.fragment whose reruns of its own (a widget inside it, a poll) are
+    # recorded as runs of the session's recorder; inside a full rerun its
+    # spans belong to that run
+    def wrap(fn):
+        @functools.wraps(fn)
+        def body(*args, **kwargs):
+            recorder = st.session_state.get("rce_perf")
+            alone = recorder is not None and not recorder.running
+            if alone:
+                recorder.memory = st.session_state.get("rce_perf_memory", False)
+                recorder.start_run()
+                token = activate(recorder)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                if alone:
+                    recorder.end_run()
+                    deactivate(token)
+        return st.fragment(body, run_every=run_every)
+    return wrap if fn is None else wrap(fn)
+
+
+def perf_panel(recorder):
+    recorder.end_run()
+    with st.sidebar.expander("⏱️ Performance"):
+        st.checkbox("Track memory (tracemalloc)", key="rce_perf_memory",
+                    help="Slows allocations in every session of this server while on; applies from the next rerun")
+        st.dataframe(recorder.summary(), hide_index=True, use_container_width=True)
+        st.download_button("Export spans (JSONL)", recorder.to_jsonl(), file_name="rce_perf.jsonl",
+                           mime="application/x-ndjson")
+
+
+# --- Seeds ---
+# Every run of a page draws from the counter-based streams of one seed, shown
+# in the sidebar: entering it again brings back the same screens for the same
+# parameters. The session starts on the entropy CounterRNG draws, folded to
+# SEED_BITS so the number input holds it exactly; "New seed" draws again.
+SEED_BITS = 32
+
+
+def _new_seed():
+    st.session_state.rce_seed = CounterRNG().seed % (1 << SEED_BITS)
+
+
+def seed_input():
+    if "rce_seed" not in st.session_state:
+        _new_seed()
+    seed = st.sidebar.number_input("Seed", 0, (1 << SEED_BITS) - 1, step=1, key="rce_seed",
+                                   help="The same seed and parameters give the same run")
+    st.sidebar.button("New seed", on_click=_new_seed)
+    return int(seed)
+
+
+# --- Background runs ---
+# The run goes to the engine's worker pool instead of blocking the script.
+# The panel draws the newest finished result (or, on a first run, the partial
+# histogram) through draw(done, counts, edges) and polls the job every POLL
+# seconds until it ends; a parameter change cancels the job still in flight.
+POLL = 0.25
+
+
+def background_run(key, name, n, draw, chunk=CHUNK, seed=None, **params):
+    runners = st.session_state.setdefault("rce_runners", {})
+    runner = runners.setdefault((_page(), key, name), Runner())
+    job = runner.submit(name, n, chunk, seed, **params)
+    polling = not job.finished
+
+    @fragment(run_every=POLL if polling else None)
+    def panel():
+        view = runner.view()
+        if job.finished and job.seconds is not None:
+            record("simulate", job.collect())
+        if view is not None:
+            draw(*view)
+        if job.error is not None:
+            st.error(f"Simulation failed: {job.error}")
+        elif not job.finished:
+            st.progress(job.done / max(job.n, 1), text=f"Simulating… {job.done:,} / {job.n:,} particles")
+        elif polling:
+            # Done: one full rerun redraws the page without the poller
+            st.rerun()
+
+    panel()
+    return job
+
+
+# --- Panels ---
+# A panel is a fragment (above): controls created inside it rerun that panel
+# alone, and only its elements are sent again. Inputs it shares with other
+# panels stay in the sidebar and are declared as deps: panel_figure()
+# rebuilds a figure only when they change, so a full rerun caused by
+# another panel's input reuses it.
+def panel_figure(name, deps, build):
+    figures = st.session_state.setdefault("rce_figures", {})
+    key = (_page(), name)
+    if key not in figures or figures[key][0] != deps:
+        figures[key] = (deps, build())
+    return figures[key][1]
+
+
+def keep(*keys):
+    # Keeps the values of keyed widgets through runs where their panel is
+    # not drawn (Streamlit drops the state of unrendered widgets)
+    for key in keys:
+        if key in st.session_state:
+            st.session_state[key] = st.session_state[key]
+
+
+# --- Live graphs ---
+# One LiveGraph per page, panel and session: each rerun's build of the graph
+# is applied to it as a diff, so only the nodes a toggle touches move, and
+# only a little. rce_engine.incremental (and networkx) load on the first
+# graph.
+def live_layout(name, G):
+    from rce_engine import LiveGraph
+    graphs = st.session_state.setdefault("rce_graphs", {})
+    key = (_page(), name)
+    if key in graphs:
+        graphs[key].sync(G)
+    else:
+        graphs[key] = LiveGraph(G)
+    return graphs[key].pos
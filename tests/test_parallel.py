@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from rce_engine.counters import CounterRNG, blocks
+from rce_engine.parallel import simulate_sharded, split
+from rce_engine.simulators import simulate, simulate_range
+
+
+# --- Counter blocks ---
+def test_blocks_are_independent_and_regenerable():
+    rng = CounterRNG(1234)
+    first = [rng.block(k).random(1000) for k in range(4)]
+    # Drawn in any order, from any instance with the seed: the same numbers
+    again = CounterRNG(1234)
+    for k in (3, 1, 0, 2):
+        np.testing.assert_array_equal(again.block(k).random(1000), first[k])
+    # Distinct blocks, streams and seeds do not repeat each other
+    values = np.concatenate(first + [rng.setup().random(1000), CounterRNG(1235).block(0).random(1000)])
+    assert len(np.unique(values)) == len(values)
+
+
+def test_unseeded_run_is_reproducible_from_its_seed():
+    rng = CounterRNG()
+    np.testing.assert_array_equal(CounterRNG(rng.seed).block(5).random(10), rng.block(5).random(10))
+
+
+def test_blocks_cover_the_range():
+    assert list(blocks(0, 10, 10, 4)) == [(0, 0, 4), (1, 4, 4), (2, 8, 2)]
+    assert list(blocks(5, 9, 10, 4)) == [(1, 4, 4), (2, 8, 2)]
+    assert list(blocks(0, 0, 10, 4)) == []
+
+
+@pytest.mark.parametrize("name, params", [
+    ("hits", {"model": "rce"}),
+    ("double_slit", {"mode": "quantum"}),
+    ("interference", {"engine": "exact"}),
+])
+def test_ranges_add_up_to_the_run(name, params):
+    n, chunk = 10_000, 1_000
+    counts, edges = simulate(name, n, 7, chunk, **params)
+    parts = [simulate_range(name, start, start + 3_000, n, 7, chunk, **params) for start in range(0, n, 3_000)]
+    np.testing.assert_array_equal(sum(part[0] for part in parts), counts)
+    np.testing.assert_array_equal(parts[0][1], edges)
+    # Unaligned ranges cover whole chunks
+    assert simulate_range(name, 1_500, 2_500, n, 7, chunk, **params)[2] == (1_000, 3_000)
+
+
+def test_ranges_need_counters():
+    with pytest.raises(ValueError):
+        simulate_range("hits", 0, 10, 10, np.random.default_rng(0))
+
+
+# --- Sharded runs ---
+def test_split():
+    assert split(10, 3) == [4, 3, 3]
+    assert sum(split(7, 16)) == 7
+
+
+@pytest.mark.parametrize("shards", [1, 3, 16])
+@pytest.mark.parametrize("name, params", [
+    ("hits", {"model": "qbism", "noise": 0.2}),
+    ("double_slit", {"mode": "classical"}),
+    ("coherence", {"engine": "exact"}),
+])
+def test_sharded_matches_simulate(name, params, shards):
+    n, chunk = 25_000, 4_000
+    counts, edges = simulate(name, n, 99, chunk, **params)
+    sharded, sharded_edges = simulate_sharded(name, n, 99, shards=shards, workers=2, chunk=chunk, **params)
+    np.testing.assert_array_equal(sharded, counts)
+    np.testing.assert_array_equal(sharded_edges, edges)
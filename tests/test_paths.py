@@ -0,0 +1,93 @@
+import math
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from rce_engine.csr import CoherenceGraph
+from rce_engine.paths import actualization_path, actualization_paths, best_paths, path_edges
+
+
+def random_graph(n, m, seed, acyclic):
+    rng = np.random.default_rng(seed)
+    G = nx.DiGraph()
+    G.add_nodes_from(range(n))
+    while G.number_of_edges() < m:
+        u, v = rng.integers(0, n, 2)
+        if u == v or (acyclic and u > v):
+            continue
+        G.add_edge(int(u), int(v), mu=float(rng.uniform(0.05, 1.0)))
+    return G
+
+
+def reference(G, source):
+    # networkx Dijkstra on -log μ: the best μ product to every reachable node
+    for u, v, d in G.edges(data=True):
+        d["cost"] = -math.log(d["mu"])
+    lengths = nx.single_source_dijkstra_path_length(G, source, weight="cost")
+    return {node: math.exp(-length) for node, length in lengths.items()}
+
+
+def product(G, path):
+    return math.prod(G.edges[u, v]["mu"] for u, v in path_edges(path))
+
+
+# --- Best μ products against networkx ---
+# The acyclic graphs go through the DAG solver, the others through Dijkstra;
+# the chain is deep enough to hand its levels to the plain Python fallback
+@pytest.mark.parametrize("n, m, seed, acyclic", [
+    (40, 120, 0, True),
+    (300, 1500, 1, True),
+    (40, 160, 2, False),
+    (300, 2000, 3, False),
+])
+def test_best_paths_match_networkx(n, m, seed, acyclic):
+    G = random_graph(n, m, seed, acyclic)
+    labels, score, pred = best_paths(G, 0)
+    expected = reference(G, 0)
+    for i, node in enumerate(labels):
+        assert score[0, i] == pytest.approx(expected.get(node, 0.0), rel=1e-12, abs=0.0)
+        if node != 0 and node in expected:
+            path = actualization_path(G, 0, node)[0]
+            assert path[0] == 0 and path[-1] == node
+            assert product(G, path) == pytest.approx(expected[node], rel=1e-12)
+
+
+def test_chain_uses_every_edge():
+    G = nx.DiGraph()
+    nx.add_path(G, range(500), mu=0.99)
+    G.add_edge(0, 499, mu=0.001)
+    path, score = actualization_path(G, 0, 499)
+    assert path == list(range(500))
+    assert score == pytest.approx(0.99 ** 499)
+
+
+def test_unreachable_targets():
+    G = nx.DiGraph()
+    G.add_edge("a", "b", mu=0.5)
+    G.add_node("c")
+    assert actualization_path(G, "a", ["c"]) == ([], 0.0)
+    assert actualization_path(G, "a", ["b", "c"]) == (["a", "b"], 0.5)
+
+
+def test_batched_mu_rows():
+    G = random_graph(60, 240, 4, False)
+    rng = np.random.default_rng(5)
+    mu = rng.uniform(0.05, 1.0, (3, G.number_of_edges()))
+    results = actualization_paths(G, [(0, [n for n in G if n != 0])], mu=mu)
+    for row, result in zip(mu, results):
+        H = G.copy()
+        for (u, v), value in zip(H.edges(), row):
+            H.edges[u, v]["mu"] = value
+        expected = reference(H, 0)
+        assert result[0][1] == pytest.approx(max(s for node, s in expected.items() if node != 0), rel=1e-12)
+
+
+def test_coherence_graph_matches_networkx():
+    # CoherenceGraph keeps μ in float32
+    G = random_graph(100, 500, 6, False)
+    csr = CoherenceGraph.from_networkx(G)
+    _, expected, _ = best_paths(G, 0)
+    labels, score, _ = best_paths(csr, 0)
+    assert labels == list(G.nodes())
+    np.testing.assert_allclose(score, expected, rtol=1e-5)
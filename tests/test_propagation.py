@@ -0,0 +1,99 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from rce_engine.propagation import actualization_probabilities, context_mu
+
+
+def random_graph(n, sinks, m, seed, acyclic=False):
+    # n inner nodes, every one with an arc to some sink, so all the activation
+    # is absorbed; the other arcs are random, with loops unless acyclic
+    rng = np.random.default_rng(seed)
+    G = nx.DiGraph()
+    G.add_nodes_from(range(n + sinks))
+    for u in range(n):
+        G.add_edge(u, int(n + rng.integers(sinks)), mu=float(rng.uniform(0.05, 1.0)))
+    while G.number_of_edges() < n + m:
+        u, v = (int(i) for i in rng.integers(0, n, 2))
+        if u != v and not (acyclic and u > v):
+            G.add_edge(u, v, mu=float(rng.uniform(0.05, 1.0)))
+    return G
+
+
+def dense_solve(G, source):
+    # Absorbing Markov chain: B = (I - Q)⁻¹ R from the row-normalised μ matrix
+    nodes = list(G.nodes())
+    P = nx.to_numpy_array(G, nodelist=nodes, weight="mu")
+    out = P.sum(axis=1)
+    absorbing = out <= 0
+    P[~absorbing] /= out[~absorbing, None]
+    transient = np.flatnonzero(~absorbing)
+    Q = P[np.ix_(transient, transient)]
+    R = P[np.ix_(transient, np.flatnonzero(absorbing))]
+    B = np.linalg.solve(np.eye(len(transient)) - Q, R)
+    result = np.zeros(len(nodes))
+    start = nodes.index(source)
+    if absorbing[start]:
+        result[start] = 1.0
+    else:
+        result[absorbing] = B[np.flatnonzero(transient == start)[0]]
+    return result
+
+
+# --- Against a dense absorbing-chain solve ---
+@pytest.mark.parametrize("n, sinks, m, seed, acyclic", [
+    (30, 5, 60, 0, True),
+    (30, 5, 60, 1, False),
+    (200, 20, 600, 2, False),
+    # Sparse enough for the plain Python fallback
+    (400, 2, 50, 3, False),
+])
+def test_matches_dense_solve(n, sinks, m, seed, acyclic):
+    G = random_graph(n, sinks, m, seed, acyclic)
+    labels, probabilities = actualization_probabilities(G, 0)
+    assert labels == list(G.nodes())
+    np.testing.assert_allclose(probabilities[0], dense_solve(G, 0), atol=1e-10)
+    assert probabilities.sum() == pytest.approx(1.0, abs=1e-10)
+
+
+def test_contexts_match_dense_solve():
+    G = random_graph(50, 6, 120, 4)
+    contexts = [[], [1, 2], [3]]
+    _, probabilities = actualization_probabilities(G, 0, context_mu(G, contexts))
+    for row, removed in zip(probabilities, contexts):
+        H = G.copy()
+        for u, v in H.edges():
+            if u in removed or v in removed:
+                H.edges[u, v]["mu"] = 0.0
+        np.testing.assert_allclose(row, dense_solve(H, 0), atol=1e-10)
+
+
+# --- Closed loops ---
+def test_trapped_mass_is_reported():
+    # Half the activation reaches a sink; the other half circles b <-> c
+    G = nx.DiGraph()
+    G.add_edge("s", "sink", mu=0.5)
+    G.add_edge("s", "b", mu=0.5)
+    G.add_edge("b", "c", mu=1.0)
+    G.add_edge("c", "b", mu=1.0)
+    with pytest.warns(RuntimeWarning, match="trapped"):
+        labels, probabilities = actualization_probabilities(G, "s")
+    result = dict(zip(labels, probabilities[0]))
+    assert result["sink"] == pytest.approx(0.5, abs=1e-12)
+    assert result["b"] == result["c"] == 0.0
+
+
+def test_long_loop_converges():
+    # A slow leak out of a long cycle: converges without warnings
+    G = nx.DiGraph()
+    nx.add_cycle(G, range(35), mu=1.0)
+    G.add_edge(17, "sink", mu=0.01)
+    labels, probabilities = actualization_probabilities(G, 0)
+    assert probabilities[0][labels.index("sink")] == pytest.approx(1.0, abs=1e-10)
+
+
+def test_negative_mu_rejected():
+    G = nx.DiGraph()
+    G.add_edge(0, 1, mu=-0.5)
+    with pytest.raises(ValueError):
+        actualization_probabilities(G, 0)
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from rce_engine.simulators import SIMULATORS, simulate, stream
+
+
+# --- Progressive runs ---
+@pytest.mark.parametrize("name", sorted(SIMULATORS))
+def test_stream_ends_at_simulate(name):
+    n, chunk = 5_000, 1_200
+    steps = list(stream(name, n, chunk, 3))
+    assert [done for done, _, _ in steps] == [1_200, 2_400, 3_600, 4_800, 5_000]
+    counts, edges = simulate(name, n, 3, chunk)
+    np.testing.assert_array_equal(steps[-1][1], counts)
+    np.testing.assert_array_equal(steps[-1][2], edges)
+    # Running histograms only grow, by one chunk of particles at a time
+    for (_, previous, _), (_, current, _) in zip(steps, steps[1:]):
+        assert (current >= previous).all()
+
+
+def test_hits_counts_every_particle():
+    steps = list(stream("hits", 5_000, 1_000, 3, model="many_worlds", noise=0.0))
+    for done, counts, _ in steps:
+        assert counts.sum() == done
+
+
+def test_partial_histograms_are_copies():
+    steps = list(stream("hits", 3_000, 1_000, 3))
+    assert steps[0][1].sum() < steps[-1][1].sum()
+
+
+def test_empty_run():
+    counts, edges = simulate("hits", 0, 3)
+    assert counts.shape == (len(edges) - 1,) and counts.sum() == 0
+
+
+def test_sequential_generator():
+    # A plain Generator is consumed chunk after chunk: same seed, same run
+    first = simulate("double_slit", 4_000, np.random.default_rng(5), 1_000)[0]
+    again = simulate("double_slit", 4_000, np.random.default_rng(5), 1_000)[0]
+    np.testing.assert_array_equal(first, again)
+
+
+def test_unknown_simulator():
+    with pytest.raises(ValueError):
+        simulate("nope", 10)
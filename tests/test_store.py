@@ -0,0 +1,90 @@
+import os
+
+import numpy as np
+import pytest
+
+from rce_engine.store import DiskStore, digest
+
+
+@pytest.fixture
+def store(tmp_path):
+    return DiskStore(tmp_path / "store")
+
+
+def entry_bytes(store):
+    return sum(size for _, size, _ in store.entries())
+
+
+# --- put / get ---
+def test_round_trip(store):
+    counts, edges = np.arange(50.0), np.linspace(-1, 1, 51)
+    store.put(("hits", 1000, 7), (counts, edges))
+    store.put("array", counts)
+    store.put("list", [counts])
+    value = store.get(("hits", 1000, 7))
+    assert isinstance(value, tuple)
+    np.testing.assert_array_equal(value[0], counts)
+    np.testing.assert_array_equal(value[1], edges)
+    np.testing.assert_array_equal(store.get("array"), counts)
+    assert isinstance(store.get("list"), list)
+    # Memory-mapped read-only
+    assert not value[0].flags.writeable
+    with pytest.raises(KeyError):
+        store.get("missing")
+    assert store.stats()["hits"] == 3 and store.stats()["misses"] == 1
+
+
+def test_unstorable_values_are_skipped(store):
+    assert store.put("scalar", 3.0) == 3.0
+    assert store.put("objects", np.array([None, 1], dtype=object)) is not None
+    assert store.stats()["entries"] == 0
+
+
+# --- Running totals ---
+def test_single_put_counted_once(store):
+    store.put("a", np.zeros(10))
+    stats = store.stats()
+    assert stats["entries"] == 1
+    assert stats["bytes"] == entry_bytes(store)
+    # Storing the same key again changes nothing
+    store.put("a", np.zeros(10))
+    assert store.stats()["entries"] == 1
+
+
+def test_totals_follow_puts(store):
+    for i in range(5):
+        store.put(i, np.zeros(100 * (i + 1)))
+    stats = store.stats()
+    assert stats["entries"] == 5
+    assert stats["bytes"] == entry_bytes(store)
+    store.rescan()
+    assert store.stats()["bytes"] == stats["bytes"]
+
+
+# --- Eviction ---
+def test_least_recently_used_evicted(store):
+    for i in range(4):
+        store.put(i, np.zeros(1000))
+        os.utime(store._path(digest(i)), (i, i))
+    size = entry_bytes(store) // 4
+    store.get(0)
+    # Five entries over a bound of three: the two least recently used go
+    store.max_bytes = 3 * size
+    store.put(4, np.zeros(1000))
+    stats = store.stats()
+    assert stats["entries"] == 3
+    assert stats["bytes"] == entry_bytes(store) <= store.max_bytes
+    for key in (0, 3, 4):
+        store.get(key)
+    for key in (1, 2):
+        with pytest.raises(KeyError):
+            store.get(key)
+
+
+def test_clear(store):
+    store.put("a", np.zeros(10))
+    store.get("a")
+    store.clear()
+    assert store.stats()["entries"] == store.stats()["bytes"] == store.stats()["hits"] == 0
+    with pytest.raises(KeyError):
+        store.get("a")
@@ -0,0 +1,73 @@
+import json
+
+import numpy as np
+import pytest
+
+from rce_engine.simulators import simulate
+from rce_engine.sweeps import parameter_grid, summarize, sweep, write_sweep
+
+
+def test_parameter_grid():
+    columns = parameter_grid({"a": [1, 2], "b": [10, 20, 30], "c": 5})
+    assert columns["a"].tolist() == [1, 1, 1, 2, 2, 2]
+    assert columns["b"].tolist() == [10, 20, 30] * 2
+    assert columns["c"].tolist() == [5] * 6
+
+
+def test_unknown_parameter():
+    with pytest.raises(ValueError):
+        sweep("hits", {"slits": [2, 3]})
+
+
+def test_reproducible():
+    grid = {"noise": [0.0, 0.2], "n": [500, 1000]}
+    first, again = sweep("interference", grid, seed=4), sweep("interference", grid, seed=4)
+    for key in first:
+        np.testing.assert_array_equal(first[key], again[key])
+
+
+# --- Batched rows against single runs ---
+@pytest.mark.parametrize("model, left_open", [("rce", True), ("qbism", True), ("classical", False)])
+def test_hits_rows_match_single_runs(model, left_open):
+    grid = {"model": model, "left_open": left_open, "noise": [0.05, 0.3], "n": [20_000, 50_000]}
+    columns = sweep("hits", grid, seed=1)
+    assert (columns["hits"] <= columns["n"]).all()
+    for row in range(4):
+        counts, edges = simulate("hits", int(columns["n"][row]), np.random.default_rng(2), model=model,
+                                 noise=float(columns["noise"][row]), left_open=left_open)
+        np.testing.assert_allclose(columns["edges"][row], edges)
+        # Same distribution, different draws
+        assert np.abs(columns["counts"][row] - counts).sum() / max(counts.sum(), 1) < 0.12
+
+
+def test_screen_rows_hold_every_particle():
+    columns = sweep("interference", {"noise": [0.0, 0.1, 0.5], "n": [1_000, 3_000]}, seed=0)
+    np.testing.assert_array_equal(columns["hits"], columns["n"])
+    expected = summarize(columns["counts"], columns["edges"])
+    np.testing.assert_array_equal(columns["visibility"], expected["visibility"])
+
+
+# --- Columnar files ---
+@pytest.mark.parametrize("name, grid", [
+    ("hits", {"model": ["rce", "many_worlds"], "noise": [0.1, 0.2]}),
+    ("interference", {"detector": [False, True], "noise": [0.0, 0.3]}),
+])
+def test_npz_round_trip(tmp_path, name, grid):
+    columns = sweep(name, grid, n=2_000, seed=3)
+    path = write_sweep(tmp_path / "sweep.npz", columns, {"simulator": name})
+    # No pickled object columns: loads with the numpy default allow_pickle=False
+    with np.load(path) as data:
+        assert set(data.files) == set(columns) | {"meta"}
+        for key, values in columns.items():
+            np.testing.assert_array_equal(data[key], values)
+        assert json.loads(str(data["meta"])) == {"simulator": name}
+
+
+def test_parquet_round_trip(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    columns = sweep("hits", {"noise": [0.1, 0.2, 0.3]}, n=2_000, seed=3)
+    table = pq.read_table(write_sweep(tmp_path / "sweep.parquet", columns, {"simulator": "hits"}))
+    assert table.num_rows == 3
+    np.testing.assert_array_equal(np.array(table["counts"].to_pylist()), columns["counts"])
+    np.testing.assert_array_equal(table["noise"].to_numpy(), columns["noise"])
+    assert json.loads(table.schema.metadata[b"meta"]) == {"simulator": "hits"}